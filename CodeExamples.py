@@ -1,16 +1,67 @@
 import random
 import math
+import operator
+from array import array
 from collections import deque
+from collections.abc import Sequence
+from functools import reduce
+from bisect import bisect_right
+from itertools import accumulate, chain, compress, islice
+
+
+def chromosome_array(genes):
+    """
+    Pack genes into the most compact typed array that holds them: int16 ('h') or int64 ('q') for
+    integer genes and float64 ('d') for floats. Genes that no typed array holds exactly (strings,
+    tuples, integers past int64, or integers too large for a float next to float genes) stay a
+    list. Arrays and Population views are kept as they are.
+
+    :param genes: A sequence of genes.
+    :return: An array, a list, or the memoryview given.
+    """
+    if isinstance(genes, (array, memoryview)):
+        return genes
+    genes = list(genes)
+    for typecode in 'hq':
+        try:
+            return array(typecode, genes)
+        except (TypeError, OverflowError):
+            pass
+    if all(isinstance(gene, float) or isinstance(gene, int) and abs(gene) <= 2 ** 53 for gene in genes):
+        return array('d', genes)
+    return genes
+
+
+def copy_chromosome(chromosome):
+    """
+    Return a writable copy of a chromosome, which may be a view into a Population's buffer.
+
+    :param chromosome: A list, array or memoryview of genes.
+    :return: A new array.
+    """
+    if isinstance(chromosome, memoryview):
+        genes = array(chromosome.format)
+        genes.frombytes(chromosome.cast('B'))
+        return genes
+    if isinstance(chromosome, array):
+        return chromosome[:]
+    return chromosome_array(list(chromosome))
 
 
 class Candidate:
+    # No per-instance __dict__: a Candidate is just these two references
+    __slots__ = ('chromosome', 'fitness')
+
     def __init__(self, chromosome, fitness=0.0):
         """
         Initialize a Candidate object.
 
-        :param chromosome: A list of integers representing a candidate solution.
+        :param chromosome: A sequence of genes representing a candidate solution; it is stored as a
+            typed array (see chromosome_array), or as given if it is already an array or a view.
+            An integer chromosome is an integer array, so writing a float gene into it raises
+            TypeError; pass float genes (e.g. [1.0, 2.0]) for a chromosome that will hold floats.
         """
-        self.chromosome = chromosome  # List of integers representing the solution
+        self.chromosome = chromosome_array(chromosome)  # Typed array of genes representing the solution
         self.fitness = fitness
 
     def calculate_fitness(self, fitness_function):
@@ -22,21 +73,193 @@ class Candidate:
         self.fitness = fitness_function(self.chromosome)
 
 
+class Population(Sequence):
+    """
+    A population stored as two flat arrays: every chromosome back to back in one contiguous gene
+    buffer, and the fitnesses in a parallel float64 array.
+
+    population[i] is a Candidate whose chromosome is a memoryview into the buffer, so reading a
+    population never copies genes; operators copy (copy_chromosome) only what they change, and
+    population[i] = candidate writes a result back in place. Every access builds a fresh Candidate,
+    so compare candidates by index, not identity.
+    """
+    def __init__(self, size, gene_size, typecode='h'):
+        """
+        :param size: The number of candidates.
+        :param gene_size: The number of genes in every chromosome.
+        :param typecode: The array typecode of the genes.
+        """
+        self.size = size
+        self.gene_size = gene_size
+        self.genes = array(typecode, bytes(array(typecode).itemsize * size * gene_size))
+        self.fitness = array('d', bytes(8 * size))
+        self._view = memoryview(self.genes)
+
+    @classmethod
+    def random(cls, size, gene_size, low=0, high=100):
+        """
+        Create a population of random integer chromosomes with genes in [low, high].
+        """
+        population = cls(size, gene_size, chromosome_array([low, high]).typecode)
+        count = len(population.genes)
+        population.genes[:] = array(population.genes.typecode, [random.randint(low, high) for _ in range(count)])
+        return population
+
+    @classmethod
+    def from_candidates(cls, candidates):
+        """
+        Pack a list of equal-length Candidates into one Population.
+        """
+        first = copy_chromosome(candidates[0].chromosome)
+        if not isinstance(first, array):
+            raise TypeError('A Population holds numeric genes only')
+        population = cls(len(candidates), len(first), first.typecode)
+        for i, candidate in enumerate(candidates):
+            population[i] = candidate
+        return population
+
+    @classmethod
+    def from_genes(cls, genes, gene_size):
+        """
+        Wrap a flat gene array (chromosomes back to back) as a Population, without copying it.
+        """
+        population = cls(0, gene_size, genes.typecode)
+        population.size = len(genes) // gene_size
+        population.genes = genes
+        population.fitness = array('d', bytes(8 * population.size))
+        population._view = memoryview(genes)
+        return population
+
+    def gather(self, indices):
+        """
+        Copy the chromosomes of the given candidates, in order, into one new flat gene array.
+
+        :param indices: Candidate indices, repeats allowed (e.g. the parents picked by selection).
+        """
+        genes = array(self.genes.typecode)
+        genes.frombytes(b''.join(self.view(i).cast('B') for i in indices))
+        return genes
+
+    def __len__(self):
+        return self.size
+
+    def view(self, i):
+        """
+        Return candidate i's chromosome as a memoryview into the gene buffer (no copy).
+        """
+        return self._view[i * self.gene_size:(i + 1) * self.gene_size]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.size))]
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError('Population index out of range')
+        return Candidate(self.view(i), self.fitness[i])
+
+    def __setitem__(self, i, candidate):
+        chromosome = candidate.chromosome
+        if not isinstance(chromosome, array) or chromosome.typecode != self.genes.typecode:
+            try:
+                chromosome = array(self.genes.typecode, chromosome)
+            except (TypeError, OverflowError):
+                # The genes do not fit this buffer's type (e.g. floats into an int16 population), so
+                #   widen the whole buffer to int64 or float64 first
+                widest = copy_chromosome(chromosome)
+                if not isinstance(widest, array):
+                    raise TypeError('A Population holds numeric genes only')
+                typecode = 'd' if 'd' in (widest.typecode, self.genes.typecode) else 'q'
+                self.genes = array(typecode, self.genes)
+                self._view = memoryview(self.genes)
+                chromosome = array(typecode, chromosome)
+        self._view[i * self.gene_size:(i + 1) * self.gene_size] = chromosome
+        self.fitness[i] = candidate.fitness
+
+    def __iter__(self):
+        return map(self.__getitem__, range(self.size))
+
+    def evaluate(self, fitness_function):
+        """
+        Calculate the fitness of every candidate into the fitness array.
+
+        :param fitness_function: A function that takes a chromosome and returns a fitness value.
+        """
+        self.fitness[:] = array('d', map(fitness_function, map(self.view, range(self.size))))
+
+    def best(self):
+        """
+        Return the fittest Candidate.
+        """
+        return self[max(range(self.size), key=self.fitness.__getitem__)]
+
+
+# Map every random byte to its lowest bit (0 or 1), for fair coin flips drawn in bulk
+_low_bit = bytes(i & 1 for i in range(256))
+
+
+def _uniforms(count):
+    """
+    Draw count floats uniformly from [0.0, 1.0).
+    """
+    return array('d', [random.random() for _ in range(count)])
+
+
+def _coin_flips(count):
+    """
+    Draw count fair 0/1 values as bytes.
+    """
+    return random.randbytes(count).translate(_low_bit)
+
+
+def _bernoulli_positions(count, probability):
+    """
+    Return, in order, the positions among count independent trials that succeed with the given
+    probability. The gaps between successes are geometric, so they are drawn directly (as
+    floor(log(U) / log(1 - probability))) and only about count * probability uniforms are needed.
+    """
+    if probability >= 1:
+        return array('q', range(count))
+    positions = array('q')
+    if probability <= 0:
+        return positions
+    log_q = math.log(1 - probability)
+    position = -1
+    while True:
+        # 1 - random() is in (0, 1], so its log is always defined
+        position += 1 + math.floor(math.log(1.0 - random.random()) / log_q)
+        if position >= count:
+            return positions
+        positions.append(position)
+
+
+def _normals(count, mean=0.0, stddev=1.0):
+    """
+    Draw count normally distributed floats with the Box-Muller transform, using both outputs of
+    every pair of uniforms.
+    """
+    normals = array('d')
+    for _ in range((count + 1) // 2):
+        radius = stddev * math.sqrt(-2.0 * math.log(1.0 - random.random()))
+        angle = 2.0 * math.pi * random.random()
+        normals.append(mean + radius * math.cos(angle))
+        normals.append(mean + radius * math.sin(angle))
+    del normals[count:]
+    return normals
+
+
 def get_random_population(pop_size=20, gene_size=50):
-    # Generate a list of pop_size candidates
-    population = []
+    # Generate pop_size candidates with gene_size random integers between 0 and 100, all in one buffer
+    population = Population.random(pop_size, gene_size, 0, 100)
 
-    for _ in range(pop_size):
-        # Generate a chromosome with gene_size random integers between 0 and 100
-        chromosome = [random.randint(0, 100) for _ in range(gene_size)]
-        # Create a Candidate object with the random chromosome and random fitness in the range (0.0, 1.0)
-        candidate = Candidate(chromosome, random.uniform(0.0, 1.0))
-        # Add to the list of candidates
-        population.append(candidate)
+    # Give every candidate a random fitness in the range (0.0, 1.0)
+    population.fitness[:] = array('d', [random.uniform(0.0, 1.0) for _ in range(pop_size)])
 
     # Print out each candidate's chromosome and fitness
     for idx, candidate in enumerate(population):
-        print(f"Candidate {idx + 1}: Chromosome = {candidate.chromosome[:5]}..., Fitness = {candidate.fitness:.4f}")
+        print(f"Candidate {idx + 1}: Chromosome = {candidate.chromosome[:5].tolist()}..., Fitness = {candidate.fitness:.4f}")
+
+    return population
 
 
 def hill_climb(candidate, fitness_function, max_iterations=1000):
@@ -65,7 +288,7 @@ def hill_climb(candidate, fitness_function, max_iterations=1000):
 
     for iteration in range(max_iterations):
         # Create a neighbor by modifying one element in the chromosome
-        neighbor_chromosome = candidate.chromosome[:]
+        neighbor_chromosome = copy_chromosome(candidate.chromosome)
         index_to_modify = random.randint(0, len(neighbor_chromosome) - 1)
 
         # Change the selected gene (in this case by a small random value for the sake of simplicity)
@@ -93,7 +316,7 @@ def test_HC():
     best_candidate = hill_climb(initial_candidate, example_fitness_function)
 
     # Output the best candidate's chromosome and fitness
-    print(f"Best Chromosome: {best_candidate.chromosome}")
+    print(f"Best Chromosome: {best_candidate.chromosome.tolist()}")
     print(f"Best Fitness: {best_candidate.fitness}")
 
 
@@ -132,7 +355,7 @@ def simulated_annealing(candidate, fitness_function, initial_temperature=1000, c
 
     while current_temperature > min_temperature:
         # Create a neighbor by modifying one element in the chromosome
-        neighbor_chromosome = candidate.chromosome[:]
+        neighbor_chromosome = copy_chromosome(candidate.chromosome)
         index_to_modify = random.randint(0, len(neighbor_chromosome) - 1)
 
         # Change the selected gene by a small random value
@@ -171,39 +394,106 @@ def test_SA():
     best_candidate = simulated_annealing(initial_candidate, example_fitness_function)
 
     # Output the best candidate's chromosome and fitness
-    print(f"Best Chromosome: {best_candidate.chromosome}")
+    print(f"Best Chromosome: {best_candidate.chromosome.tolist()}")
     print(f"Best Fitness: {best_candidate.fitness}")
 
 
-def tabu_search(initial_candidate, fitness_function, tabu_list_size=10, max_iterations=100, neighborhood_size=10):
+class TabuMemory:
+    """
+    A tabu list of hashable keys with a fixed tenure: a deque remembers the order keys expire in
+    and a dict counts the copies of each key still in the deque, so adding, expiring and checking
+    a key are all O(1) whatever the tenure.
+    """
+    def __init__(self, tenure):
+        """
+        :param tenure: How many of the most recently added keys stay tabu.
+        """
+        self.tenure = tenure
+        self.queue = deque()
+        self.counts = {}
+
+    def add(self, key):
+        self.queue.append(key)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if len(self.queue) > self.tenure:
+            expired = self.queue.popleft()
+            if self.counts[expired] == 1:
+                del self.counts[expired]
+            else:
+                self.counts[expired] -= 1
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class ZobristHasher:
+    """
+    Zobrist hashing of chromosomes: every (index, value) pair gets a random 64-bit key, drawn the
+    first time it is seen, and a chromosome hashes to the XOR of its genes' keys. Changing one
+    gene then updates the hash with two XORs instead of rehashing the whole chromosome.
+    """
+    def __init__(self, seed=None):
+        # A private generator, so hashing leaves the random module's sequence alone
+        self.rng = random.Random(seed)
+        self.keys = {}
+
+    def key(self, index, value):
+        pair = (index, value)
+        key = self.keys.get(pair)
+        if key is None:
+            key = self.keys[pair] = self.rng.getrandbits(64)
+        return key
+
+    def hash(self, chromosome):
+        return reduce(operator.xor, map(self.key, range(len(chromosome)), chromosome), 0)
+
+    def update(self, chromosome_hash, index, old_value, new_value):
+        """
+        Return the hash of a chromosome after its gene at index changes from old_value to new_value.
+        """
+        return chromosome_hash ^ self.key(index, old_value) ^ self.key(index, new_value)
+
+
+def tabu_search(initial_candidate, fitness_function, tabu_list_size=10, max_iterations=100, neighborhood_size=10,
+                tabu_mode='solution'):
     """
     Performs Tabu Search on a given Candidate object.
 
     :param initial_candidate: The initial Candidate object.
     :param fitness_function: A function that evaluates and returns the fitness of a chromosome.
-    :param tabu_list_size: The maximum size of the Tabu List.
+    :param tabu_list_size: The maximum size of the Tabu List (the tabu tenure).
     :param max_iterations: The maximum number of iterations to perform.
     :param neighborhood_size: The number of neighbors to explore in each iteration.
+    :param tabu_mode: 'solution' to make recently visited chromosomes tabu, or 'attribute' to make
+        undoing a recent move tabu (setting a gene back to a value it recently had).
     :return: The best Candidate found.
 
     Explanation:
         Initial Setup:
             The fitness of the initial candidate is calculated using the provided fitness_function.
             The initial candidate is set as both the current_candidate and best_candidate.
-            A Tabu List is initialized using deque with a maximum size (tabu_list_size), ensuring that old solutions are removed as new ones are added.
+            A Tabu List is initialized as a TabuMemory with a tenure of tabu_list_size, ensuring that old entries expire as new ones are added.
         Neighborhood Generation:
             In each iteration, a neighborhood of candidates is generated by randomly modifying one gene in the chromosome.
-            Each neighbor's fitness is calculated, and they are added to the neighborhood list.
+            Each neighbor's fitness is calculated, and they are added to the neighborhood list along with the move that made them.
         Tabu List and Aspiration Criteria:
-            The best candidate from the neighborhood that is not in the Tabu List (or meets the aspiration criteria by having a fitness better than the best overall solution) is selected as the best_neighbor.
+            In 'solution' mode the Tabu List holds Zobrist hashes of recent chromosomes; a neighbor's hash is the current hash updated for its one changed gene, so no chromosome is copied into the list or compared gene by gene.
+            In 'attribute' mode the Tabu List holds (index, old_value) pairs of accepted moves, and a neighbor is tabu if it sets a gene back to a recent old value.
+            The best candidate from the neighborhood that is not tabu (or meets the aspiration criteria by having a fitness better than the best overall solution) is selected as the best_neighbor.
             This allows Tabu Search to avoid revisiting recently explored solutions while considering moving to better ones.
         Update:
             If the best_neighbor is better than the current candidate, it replaces the current candidate.
             If it also improves upon the best candidate found so far, it is updated as the best_candidate.
-            The chromosome of the current candidate is added to the Tabu List.
+            The current candidate's hash (or the accepted move) is added to the Tabu List.
         Termination:
             The search stops after a given number of iterations (max_iterations), and the best candidate found is returned.
     """
+    if tabu_mode not in ('solution', 'attribute'):
+        raise ValueError(f"Unknown tabu_mode {tabu_mode!r}, expected 'solution' or 'attribute'")
+
     # Calculate the fitness of the initial candidate
     initial_candidate.calculate_fitness(fitness_function)
 
@@ -212,10 +502,14 @@ def tabu_search(initial_candidate, fitness_function, tabu_list_size=10, max_iter
     best_candidate = initial_candidate
 
     # Initialize an empty Tabu List
-    tabu_list = deque(maxlen=tabu_list_size)
+    tabu_list = TabuMemory(tabu_list_size)
 
-    # Add the initial candidate's chromosome to the Tabu List
-    tabu_list.append(tuple(current_candidate.chromosome))
+    # Add the initial candidate's chromosome hash to the Tabu List
+    hasher = ZobristHasher()
+    current_hash = 0
+    if tabu_mode == 'solution':
+        current_hash = hasher.hash(current_candidate.chromosome)
+        tabu_list.add(current_hash)
 
     # Iterate through the search process
     for iteration in range(max_iterations):
@@ -223,32 +517,45 @@ def tabu_search(initial_candidate, fitness_function, tabu_list_size=10, max_iter
         neighborhood = []
         for _ in range(neighborhood_size):
             # Create a neighbor by modifying one random gene in the chromosome
-            neighbor_chromosome = current_candidate.chromosome[:]
+            neighbor_chromosome = copy_chromosome(current_candidate.chromosome)
             index_to_modify = random.randint(0, len(neighbor_chromosome) - 1)
+            old_value = neighbor_chromosome[index_to_modify]
             neighbor_chromosome[index_to_modify] = random.randint(0, 100)
+            new_value = neighbor_chromosome[index_to_modify]
 
             # Create a new candidate from the modified chromosome
             neighbor = Candidate(neighbor_chromosome)
             neighbor.calculate_fitness(fitness_function)
 
+            # The neighbor's tabu key: its chromosome hash, or the gene value its move would restore
+            if tabu_mode == 'solution':
+                neighbor_hash = hasher.update(current_hash, index_to_modify, old_value, new_value)
+                key = neighbor_hash
+            else:
+                neighbor_hash = 0
+                key = (index_to_modify, new_value)
+
             # Add the neighbor to the neighborhood
-            neighborhood.append(neighbor)
+            neighborhood.append((neighbor, key, neighbor_hash, (index_to_modify, old_value)))
 
         # Find the best neighbor that is not in the Tabu List or meets aspiration criteria
         best_neighbor = None
-        for neighbor in neighborhood:
-            if tuple(neighbor.chromosome) not in tabu_list or neighbor.fitness > best_candidate.fitness:
-                if best_neighbor is None or neighbor.fitness > best_neighbor.fitness:
-                    best_neighbor = neighbor
+        for neighbor, key, neighbor_hash, move in neighborhood:
+            if key not in tabu_list or neighbor.fitness > best_candidate.fitness:
+                if best_neighbor is None or neighbor.fitness > best_neighbor[0].fitness:
+                    best_neighbor = (neighbor, key, neighbor_hash, move)
 
         # If a better solution is found, update the current and best candidates
-        if best_neighbor and best_neighbor.fitness > current_candidate.fitness:
-            current_candidate = best_neighbor
-            if best_neighbor.fitness > best_candidate.fitness:
-                best_candidate = best_neighbor
+        if best_neighbor and best_neighbor[0].fitness > current_candidate.fitness:
+            current_candidate, _, current_hash, move = best_neighbor
+            if tabu_mode == 'attribute':
+                tabu_list.add(move)
+            if current_candidate.fitness > best_candidate.fitness:
+                best_candidate = current_candidate
 
-        # Add the current candidate's chromosome to the Tabu List
-        tabu_list.append(tuple(current_candidate.chromosome))
+        # Add the current candidate's chromosome hash to the Tabu List
+        if tabu_mode == 'solution':
+            tabu_list.add(current_hash)
 
     return best_candidate
 
@@ -265,7 +572,7 @@ def test_TS():
     best_candidate = tabu_search(initial_candidate, example_fitness_function)
 
     # Output the best candidate's chromosome and fitness
-    print(f"Best Chromosome: {best_candidate.chromosome}")
+    print(f"Best Chromosome: {best_candidate.chromosome.tolist()}")
     print(f"Best Fitness: {best_candidate.fitness}")
 
 
@@ -279,22 +586,24 @@ def roulette_wheel_selection(generation):
     # Calculate the total fitness of the generation
     total_fitness = sum(candidate.fitness for candidate in generation)
 
-    # Create a helper function to perform roulette wheel selection once
+    # Create a helper function to perform roulette wheel selection once, returning an index so that
+    #   the two parents can be told apart even when the generation builds candidates on access
     def select_one():
         pick = random.uniform(0, total_fitness)
         current = 0
-        for candidate in generation:
+        for i, candidate in enumerate(generation):
             current += candidate.fitness
             if current > pick:
-                return candidate
+                return i
+        return len(generation) - 1
 
     # Select two parents
-    parent1 = select_one()
-    parent2 = select_one()
-    while parent2 == parent1:
-        parent2 = select_one()
+    index1 = select_one()
+    index2 = select_one()
+    while index2 == index1:
+        index2 = select_one()
 
-    return parent1, parent2
+    return generation[index1], generation[index2]
 
 
 def rank_based_selection(generation):
@@ -418,6 +727,132 @@ def elitism_selection(generation, elite_fraction=0.1):
     return parent1, parent2
 
 
+class Selector:
+    """
+    Selection tables for one generation, built once and then used to draw any number of parents.
+
+    The fitnesses are read once into an array, the fitness order is sorted at most once, and the
+    cumulative weights of each strategy are built on first use, so drawing k parents costs
+    O(k log N) binary searches (random.choices with cum_weights bisects them) instead of a scan or
+    a sort of the generation per pair.
+    """
+    def __init__(self, generation):
+        """
+        :param generation: List of Candidate objects, or a Population.
+        """
+        self.generation = generation if isinstance(generation, Population) else list(generation)
+        if isinstance(generation, Population):
+            self.fitness = generation.fitness
+        else:
+            self.fitness = array('d', (candidate.fitness for candidate in self.generation))
+        self.size = len(self.fitness)
+        self._ascending = None
+        self._tables = {}
+
+    @property
+    def ascending(self):
+        """
+        Candidate indices sorted from the least to the most fit.
+        """
+        if self._ascending is None:
+            self._ascending = sorted(range(self.size), key=self.fitness.__getitem__)
+        return self._ascending
+
+    def _table(self, name, build):
+        if name not in self._tables:
+            self._tables[name] = list(build())
+        return self._tables[name]
+
+    def roulette(self, k):
+        """
+        Draw k indices with probability proportional to fitness (uniformly if the total is zero).
+        """
+        cum_weights = self._table('roulette', lambda: accumulate(self.fitness))
+        if not cum_weights or cum_weights[-1] <= 0:
+            return random.choices(range(self.size), k=k)
+        return random.choices(range(self.size), cum_weights=cum_weights, k=k)
+
+    def rank(self, k):
+        """
+        Draw k indices with probability proportional to their 1-based rank (the fittest has rank N).
+        """
+        # The cumulative ranks 1, 1 + 2, 1 + 2 + 3, ... are the triangular numbers
+        cum_weights = self._table('rank', lambda: (r * (r + 1) // 2 for r in range(1, self.size + 1)))
+        return random.choices(self.ascending, cum_weights=cum_weights, k=k)
+
+    def tournament(self, k, tournament_size=3):
+        """
+        Draw k tournament winners without running the tournaments: the winner of tournament_size
+        distinct random candidates is the one with ascending rank i with probability
+        C(i, tournament_size - 1) / C(N, tournament_size), so winners are drawn straight from
+        those weights.
+        """
+        cum_weights = self._table(('tournament', tournament_size),
+                                  lambda: accumulate(math.comb(i, tournament_size - 1) for i in range(self.size)))
+        return random.choices(self.ascending, cum_weights=cum_weights, k=k)
+
+    def stochastic_universal_sampling(self, k):
+        """
+        Draw k indices with k evenly spaced pointers over the cumulative fitness, in one pass.
+        """
+        cum_weights = self._table('roulette', lambda: accumulate(self.fitness))
+        total_fitness = cum_weights[-1] if cum_weights else 0
+        if total_fitness <= 0:
+            return random.choices(range(self.size), k=k)
+        pointer_spacing = total_fitness / k
+        current_point = random.uniform(0, pointer_spacing)
+        indices = []
+        index = 0
+        for _ in range(k):
+            # Move on to the first candidate whose cumulative fitness passes the pointer
+            index = bisect_right(cum_weights, current_point, index)
+            indices.append(min(index, self.size - 1))
+            current_point += pointer_spacing
+        return indices
+
+    def truncation(self, k, truncation_percentage=0.5):
+        """
+        Draw k indices uniformly from the top truncation_percentage of the generation.
+        """
+        truncation_size = max(1, int(truncation_percentage * self.size))
+        return random.choices(self.ascending[self.size - truncation_size:], k=k)
+
+    def elitism(self, k, elite_fraction=0.1):
+        """
+        Draw k indices uniformly from the top elite_fraction of the generation.
+        """
+        return self.truncation(k, elite_fraction)
+
+    def select_indices(self, k, method='roulette', **options):
+        """
+        Draw k parent indices with the named strategy.
+
+        :param k: Number of parents to select.
+        :param method: 'roulette', 'rank', 'tournament', 'stochastic_universal_sampling',
+            'truncation' or 'elitism'.
+        :param options: Options of the strategy, such as tournament_size.
+        :return: A list of k indices into the generation.
+        """
+        return getattr(self, method)(k, **options)
+
+    def select(self, k, method='roulette', **options):
+        """
+        Draw k parents with the named strategy (see select_indices).
+
+        :return: A list of k Candidate objects.
+        """
+        return [self.generation[i] for i in self.select_indices(k, method, **options)]
+
+    def pairs(self, k, method='roulette', **options):
+        """
+        Draw the parents of k offspring, in the form the *_batch crossovers take.
+
+        :return: A tuple of two lists of k indices (first parents, second parents).
+        """
+        indices = self.select_indices(2 * k, method, **options)
+        return indices[:k], indices[k:]
+
+
 def n_point_crossover(parent1, parent2, n_points=2):
     """
     Perform N-point Crossover.
@@ -446,6 +881,31 @@ def n_point_crossover(parent1, parent2, n_points=2):
     return Candidate(offspring_chromosome)
 
 
+def n_point_crossover_batch(population, parents1, parents2, n_points=2):
+    """
+    Perform N-point Crossover for a whole generation at once.
+
+    :param population: The Population holding the parents.
+    :param parents1: First parent (index into population) of every offspring.
+    :param parents2: Second parent of every offspring.
+    :param n_points: Number of crossover points.
+    :return: A new Population with one offspring per pair, each drawn as n_point_crossover would.
+    """
+    length = population.gene_size
+    offspring = population.gather(parents1)
+    second = memoryview(population.gather(parents2))
+    genes = memoryview(offspring)
+
+    # Start from the first parents and copy in every other segment of the second parents
+    for row in range(len(parents1)):
+        points = sorted(random.sample(range(1, length), n_points)) + [length]
+        base = row * length
+        for start, end in zip(points[::2], points[1::2]):
+            genes[base + start:base + end] = second[base + start:base + end]
+
+    return Population.from_genes(offspring, length)
+
+
 def uniform_crossover(parent1, parent2):
     """
     Perform Uniform Crossover.
@@ -460,6 +920,23 @@ def uniform_crossover(parent1, parent2):
     return Candidate(offspring_chromosome)
 
 
+def uniform_crossover_batch(population, parents1, parents2):
+    """
+    Perform Uniform Crossover for a whole generation at once: every gene comes from either parent
+    by a fair coin flip, all drawn in one batch.
+
+    :param population: The Population holding the parents.
+    :param parents1: First parent (index into population) of every offspring.
+    :param parents2: Second parent of every offspring.
+    :return: A new Population with one offspring per pair.
+    """
+    first = population.gather(parents1)
+    second = population.gather(parents2)
+    flips = _coin_flips(len(first))
+    offspring = array(first.typecode, [gene2 if flip else gene1 for gene1, gene2, flip in zip(first, second, flips)])
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def arithmetic_crossover(parent1, parent2, alpha=0.5):
     """
     Perform Arithmetic Crossover.
@@ -475,6 +952,22 @@ def arithmetic_crossover(parent1, parent2, alpha=0.5):
     return Candidate(offspring_chromosome)
 
 
+def arithmetic_crossover_batch(population, parents1, parents2, alpha=0.5):
+    """
+    Perform Arithmetic Crossover for a whole generation at once.
+
+    :param population: The Population holding the parents.
+    :param parents1: First parent (index into population) of every offspring.
+    :param parents2: Second parent of every offspring.
+    :param alpha: Weighting factor for averaging parent genes.
+    :return: A new Population of float genes with one offspring per pair.
+    """
+    first = population.gather(parents1)
+    second = population.gather(parents2)
+    offspring = array('d', [alpha * gene1 + (1 - alpha) * gene2 for gene1, gene2 in zip(first, second)])
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def blend_crossover(parent1, parent2, alpha=0.5):
     """
     Perform Blend Crossover (BLX-α).
@@ -494,6 +987,26 @@ def blend_crossover(parent1, parent2, alpha=0.5):
     return Candidate(offspring_chromosome)
 
 
+def blend_crossover_batch(population, parents1, parents2, alpha=0.5):
+    """
+    Perform Blend Crossover (BLX-α) for a whole generation at once: every gene is drawn uniformly
+    from [min - alpha * d, max + alpha * d] as gene1 + (gene2 - gene1) * v, with v uniform over
+    [-alpha, 1 + alpha] from one batch of draws; this covers the same interval whichever parent
+    gene is the smaller.
+
+    :param population: The Population holding the parents.
+    :param parents1: First parent (index into population) of every offspring.
+    :param parents2: Second parent of every offspring.
+    :param alpha: Alpha parameter controlling the range of exploration.
+    :return: A new Population of float genes with one offspring per pair.
+    """
+    first = population.gather(parents1)
+    second = population.gather(parents2)
+    v = [u * (1 + 2 * alpha) - alpha for u in _uniforms(len(first))]
+    offspring = array('d', [gene1 + (gene2 - gene1) * x for gene1, gene2, x in zip(first, second, v)])
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def cut_and_splice_crossover(parent1, parent2):
     """
     Perform Cut-and-Splice Crossover.
@@ -505,14 +1018,24 @@ def cut_and_splice_crossover(parent1, parent2):
     cut_point1 = random.randint(0, len(parent1.chromosome) - 1)
     cut_point2 = random.randint(0, len(parent2.chromosome) - 1)
 
-    offspring_chromosome = parent1.chromosome[:cut_point1] + parent2.chromosome[cut_point2:]
+    offspring_chromosome = list(parent1.chromosome[:cut_point1]) + list(parent2.chromosome[cut_point2:])
 
     return Candidate(offspring_chromosome)
 
 
+def position_index(chromosome):
+    """
+    Map every gene of a permutation to its position.
+
+    :param chromosome: A permutation (list, array or view) of distinct genes.
+    :return: A dict from gene to position.
+    """
+    return dict(zip(chromosome, range(len(chromosome))))
+
+
 def order_crossover(parent1, parent2):
     """
-    Perform Order Crossover (OX).
+    Perform Order Crossover (OX) in O(n).
 
     :param parent1: First parent (Candidate object).
     :param parent2: Second parent (Candidate object).
@@ -522,17 +1045,144 @@ def order_crossover(parent1, parent2):
 
     # Select a random segment from Parent 1
     start, end = sorted(random.sample(range(length), 2))
-    offspring_chromosome = [None] * length
-    offspring_chromosome[start:end] = parent1.chromosome[start:end]
+    segment = parent1.chromosome[start:end]
 
-    # Fill the remaining positions with Parent 2's genes in the same order
-    parent2_genes = [gene for gene in parent2.chromosome if gene not in offspring_chromosome]
+    # Mark where Parent 1's segment genes sit in Parent 2, instead of searching the offspring for each gene
+    position2 = position_index(parent2.chromosome)
+    free = bytearray(b'\1' * length)
+    for gene in segment:
+        free[position2[gene]] = 0
 
-    idx = 0
-    for i in range(length):
-        if offspring_chromosome[i] is None:
-            offspring_chromosome[i] = parent2_genes[idx]
-            idx += 1
+    # Fill the remaining positions with Parent 2's unmarked genes in the same order
+    parent2_genes = compress(parent2.chromosome, free)
+    offspring_chromosome = list(islice(parent2_genes, start))
+    offspring_chromosome += segment
+    offspring_chromosome += parent2_genes
+
+    return Candidate(offspring_chromosome)
+
+
+def partially_mapped_crossover(parent1, parent2):
+    """
+    Perform Partially Mapped Crossover (PMX) in O(n).
+
+    :param parent1: First parent (Candidate object).
+    :param parent2: Second parent (Candidate object).
+    :return: A new Candidate (offspring) with Parent 1's segment and Parent 2's genes elsewhere.
+
+    Explanation:
+        A random segment is copied from Parent 1. Every other position takes Parent 2's gene, unless
+        that gene is already in the segment; then the mapping segment gene -> Parent 2's gene at the
+        same position is followed until it leads outside the segment. A position index of Parent 1
+        makes each step O(1), and the mapping chains are never longer than the segment.
+    """
+    chromosome1 = parent1.chromosome
+    chromosome2 = parent2.chromosome
+    length = len(chromosome1)
+    start, end = sorted(random.sample(range(length), 2))
+    position1 = position_index(chromosome1)
+
+    offspring_chromosome = list(chromosome2)
+    offspring_chromosome[start:end] = chromosome1[start:end]
+    for i in chain(range(start), range(end, length)):
+        gene = chromosome2[i]
+        position = position1[gene]
+        while start <= position < end:
+            gene = chromosome2[position]
+            position = position1[gene]
+        offspring_chromosome[i] = gene
+
+    return Candidate(offspring_chromosome)
+
+
+def cycle_crossover(parent1, parent2):
+    """
+    Perform Cycle Crossover (CX) in O(n).
+
+    :param parent1: First parent (Candidate object).
+    :param parent2: Second parent (Candidate object).
+    :return: A new Candidate (offspring) where every gene keeps its position in one of the parents.
+
+    Explanation:
+        The positions split into cycles: from position i, Parent 2's gene there sits in Parent 1 at
+        position j, Parent 2's gene at j sits in Parent 1 at k, and so on back to i. The offspring
+        takes alternate cycles from Parent 1 and Parent 2. A position index of Parent 1 and a
+        visited mask walk every position exactly once.
+    """
+    chromosome1 = parent1.chromosome
+    chromosome2 = parent2.chromosome
+    length = len(chromosome1)
+    position1 = position_index(chromosome1)
+
+    offspring_chromosome = list(chromosome1)
+    visited = bytearray(length)
+    from_parent2 = False
+    for first in range(length):
+        if visited[first]:
+            continue
+        i = first
+        while not visited[i]:
+            visited[i] = 1
+            if from_parent2:
+                offspring_chromosome[i] = chromosome2[i]
+            i = position1[chromosome2[i]]
+        from_parent2 = not from_parent2
+
+    return Candidate(offspring_chromosome)
+
+
+def edge_recombination_crossover(parent1, parent2):
+    """
+    Perform Edge Recombination Crossover (ERX) in O(n).
+
+    :param parent1: First parent (Candidate object).
+    :param parent2: Second parent (Candidate object).
+    :return: A new Candidate (offspring) built mostly from edges (adjacent gene pairs) of the parents.
+
+    Explanation:
+        Edge Table:
+            Every gene gets the set of its neighbours in either parent, at most four genes, treating
+            both chromosomes as cycles (as for a TSP tour).
+        Construction:
+            Starting from Parent 1's first gene, each step removes the current gene from its
+            neighbours' sets and moves to the neighbour with the fewest remaining neighbours (ties
+            broken at random). When the current gene has no neighbours left, the next gene is a
+            random unvisited one, taken from a shuffled list whose visited entries are skipped
+            (each is skipped once), so the whole construction stays O(n).
+    """
+    chromosome1 = parent1.chromosome
+    chromosome2 = parent2.chromosome
+    length = len(chromosome1)
+    # Work on gene ids (positions in Parent 1) so the edge table and the masks are plain lists
+    position1 = position_index(chromosome1)
+    ids2 = [position1[gene] for gene in chromosome2]
+
+    edges = [{(i - 1) % length, (i + 1) % length} for i in range(length)]
+    for j, gene in enumerate(ids2):
+        edges[gene].add(ids2[j - 1])
+        edges[gene].add(ids2[(j + 1) % length])
+    for gene, neighbours in enumerate(edges):
+        neighbours.discard(gene)
+
+    remaining = list(range(length))
+    random.shuffle(remaining)
+    visited = bytearray(length)
+    offspring_chromosome = []
+    current = 0
+    while True:
+        visited[current] = 1
+        offspring_chromosome.append(chromosome1[current])
+        if len(offspring_chromosome) == length:
+            break
+        for neighbour in edges[current]:
+            edges[neighbour].discard(current)
+        if edges[current]:
+            fewest = min(len(edges[neighbour]) for neighbour in edges[current])
+            current = random.choice([neighbour for neighbour in edges[current] if len(edges[neighbour]) == fewest])
+        else:
+            while visited[remaining[-1]]:
+                remaining.pop()
+            current = remaining.pop()
 
     return Candidate(offspring_chromosome)
 
@@ -558,6 +1208,23 @@ def uniform_mutation(candidate, mutation_probability):
     return Candidate(offspring_chromosome)
 
 
+def uniform_mutation_batch(population, mutation_probability):
+    """
+    Perform Uniform Mutation on every candidate of a Population at once. Only the genes picked for
+    mutation (see _bernoulli_positions) cost any random draws.
+
+    :param population: The Population to mutate.
+    :param mutation_probability: The probability that each gene will be mutated.
+    :return: A new Population after mutation.
+    """
+    offspring = population.genes[:]
+    mutated = _bernoulli_positions(len(offspring), mutation_probability)
+    for index in mutated:
+        offspring[index] = random.randint(0, 100)  # Adjust the range based on the problem
+
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def multi_point_mutation(candidate, num_points=1):
     """
     Perform Multi-Point Mutation on a Candidate.
@@ -566,7 +1233,7 @@ def multi_point_mutation(candidate, num_points=1):
     :param num_points: The number of genes to be mutated.
     :return: A new Candidate object after mutation.
     """
-    offspring_chromosome = candidate.chromosome[:]
+    offspring_chromosome = copy_chromosome(candidate.chromosome)
 
     # Select num_points unique genes for mutation
     mutation_indices = random.sample(range(len(offspring_chromosome)), num_points)
@@ -593,6 +1260,20 @@ def gaussian_mutation(candidate, mean=0, stddev=1):
     return Candidate(offspring_chromosome)
 
 
+def gaussian_mutation_batch(population, mean=0, stddev=1):
+    """
+    Perform Gaussian Mutation on every candidate of a Population at once.
+
+    :param population: The Population to mutate.
+    :param mean: Mean of the Gaussian distribution.
+    :param stddev: Standard deviation of the Gaussian distribution.
+    :return: A new Population of float genes after mutation.
+    """
+    genes = population.genes
+    offspring = array('d', [gene + noise for gene, noise in zip(genes, _normals(len(genes), mean, stddev))])
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def boundary_mutation(candidate, lower_bound, upper_bound):
     """
     Perform Boundary Mutation by replacing a random gene with its upper or lower boundary.
@@ -602,7 +1283,8 @@ def boundary_mutation(candidate, lower_bound, upper_bound):
     :param upper_bound: Upper boundary for mutation.
     :return: A new Candidate after mutation.
     """
-    offspring_chromosome = candidate.chromosome[:]
+    # A list, since the boundaries may not fit the chromosome's array type
+    offspring_chromosome = list(candidate.chromosome)
     mutation_index = random.randint(0, len(offspring_chromosome) - 1)
 
     # Randomly set to lower or upper boundary
@@ -621,7 +1303,7 @@ def swap_mutation(candidate):
     :param candidate: Candidate object whose chromosome will be mutated.
     :return: A new Candidate after mutation.
     """
-    offspring_chromosome = candidate.chromosome[:]
+    offspring_chromosome = copy_chromosome(candidate.chromosome)
     idx1, idx2 = random.sample(range(len(offspring_chromosome)), 2)
 
     # Swap the two genes
@@ -637,7 +1319,7 @@ def scramble_mutation(candidate):
     :param candidate: Candidate object whose chromosome will be mutated.
     :return: A new Candidate after mutation.
     """
-    offspring_chromosome = candidate.chromosome[:]
+    offspring_chromosome = copy_chromosome(candidate.chromosome)
 
     # Select a random range to scramble
     start, end = sorted(random.sample(range(len(offspring_chromosome)), 2))
@@ -657,7 +1339,7 @@ def inversion_mutation(candidate):
     :param candidate: Candidate object whose chromosome will be mutated.
     :return: A new Candidate after mutation.
     """
-    offspring_chromosome = candidate.chromosome[:]
+    offspring_chromosome = copy_chromosome(candidate.chromosome)
 
     # Select a random range to invert
     start, end = sorted(random.sample(range(len(offspring_chromosome)), 2))
@@ -692,6 +1374,26 @@ def non_uniform_mutation(candidate, generation, max_generations, mutation_probab
     return Candidate(offspring_chromosome)
 
 
+def non_uniform_mutation_batch(population, generation, max_generations, mutation_probability=0.1):
+    """
+    Perform Non-Uniform Mutation on every candidate of a Population at once.
+
+    :param population: The Population to mutate.
+    :param generation: Current generation (used to control mutation size).
+    :param max_generations: Total number of generations (for scaling mutation).
+    :param mutation_probability: Probability of mutation for each gene.
+    :return: A new Population of float genes after mutation.
+    """
+    offspring = array('d', population.genes)
+    mutated = _bernoulli_positions(len(offspring), mutation_probability)
+    scale = 1 - generation / max_generations
+    # A random sign (2 * flip - 1) times a delta that shrinks as generation increases
+    for index, u, flip in zip(mutated, _uniforms(len(mutated)), _coin_flips(len(mutated))):
+        offspring[index] += (2 * flip - 1) * u * scale
+
+    return Population.from_genes(offspring, population.gene_size)
+
+
 def adaptive_mutation(candidate, population, improvement_threshold=0.1, mutation_probability=0.1):
     """
     Perform Adaptive Mutation where the mutation probability is adjusted based on population stagnation.
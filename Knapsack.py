@@ -1,8 +1,18 @@
+import argparse
+import bisect
+import csv
+import json
 import math
+import queue
 import random
+import sys
+import time
 import tkinter as tk
 from tkinter import *
 import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, compress
 
 num_items = 100
 frac_target = 0.7
@@ -12,56 +22,630 @@ max_value = 2048
 screen_padding = 25
 item_padding = 5
 stroke_width = 5
+# Rows of the item grid are never squeezed below this height; items that do not fit on the
+#   screen are reached by scrolling, and only the visible page of items is ever on the canvas
+min_row_height = 14
 
 num_generations = 1000
 pop_size = 50
 elitism_count = 2
 mutation_rate = 0.1
 
-sleep_time = 0.1
+# Island model: sub-populations evolved in separate processes, exchanging their best genomes
+#   every migration_interval generations along a 'ring' or 'full' topology
+num_islands = 4
+migration_interval = 25
+migration_count = 2
+migration_topology = 'ring'
 
+# Optional pause between generations on the solver thread (0 runs the GA at full speed)
+sleep_time = 0.0
+# Canvas updates are coalesced so the display never redraws more often than this
+max_fps = 30
+# Number of best-so-far snapshots the solver thread may queue before the oldest is dropped
+snapshot_queue_size = 8
 
-def random_rgb_color():
-    red = random.randint(0x10, 0xff)
-    green = random.randint(0x10, 0xff)
-    blue = random.randint(0x10, 0xff)
-    hex_color = '#{:02x}{:02x}{:02x}'.format(red, green, blue)
-    return hex_color
+# Largest reachable-sums tables (in bits: the bitset plus the 32-bit item recorded per sum) the
+#   exact solver will build before it falls back to meet-in-the-middle, and the most items
+#   meet-in-the-middle will enumerate
+max_bitset_bits = 1 << 28
+max_mitm_items = 40
 
 
-class Item:
-    def __init__(self):
-        self.value = random.randint(min_value, max_value)
-        self.color = random_rgb_color()
-        self.x = 0
-        self.y = 0
-        self.w = 0
-        self.h = 0
-
-    def place(self, x, y, w, h):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
-
-    def draw(self, canvas, active=False):
-        canvas.create_text(self.x+self.w+item_padding+stroke_width*2, self.y+self.h/2, text=f'{self.value}')
-        if active:
-            canvas.create_rectangle(self.x,
-                                    self.y,
-                                    self.x+self.w,
-                                    self.y+self.h,
-                                    fill=self.color,
-                                    outline=self.color,
-                                    width=stroke_width)
+# Color channels are kept in 0x10-0xff so that no item is drawn (nearly) black
+color_table = bytes(0x10 + b * (0xff - 0x10) // 0xff for b in range(256))
+
+
+def random_values(n, rng=random):
+    """
+    Draw n distinct item values by sampling without replacement, in O(n).
+
+    Values come from min_value..max_value; the range is widened when it holds fewer than n values.
+    """
+    upper = max(max_value, min_value + n - 1)
+    return rng.sample(range(min_value, upper + 1), n)
+
+
+class ItemSet:
+    """
+    The items of an instance as compact parallel arrays: an array of values and three color bytes
+    (red, green, blue) per item, instead of one Python object per item.
+    """
+    def __init__(self, values, colors):
+        self.values = values
+        self.colors = colors
+
+    @classmethod
+    def random(cls, n=num_items, rng=random):
+        values = array('q', random_values(n, rng))
+        colors = bytearray(rng.randbytes(3 * n)).translate(color_table)
+        return cls(values, colors)
+
+    def __len__(self):
+        return len(self.values)
+
+    def color(self, i):
+        return '#{:02x}{:02x}{:02x}'.format(*self.colors[3 * i:3 * i + 3])
+
+
+class Genome:
+    """
+    A single genome that carries its own item sum.
+
+    The sum is updated by delta whenever bits change, so flipping a bit costs O(1) and splicing in
+    a segment from another genome only touches that segment, never the whole genome.
+    """
+    __slots__ = ('bits', 'total', 'values')
+
+    def __init__(self, bits, total, values):
+        """
+        :param bits: A bytearray of 0/1 genes.
+        :param total: The item sum of bits.
+        :param values: A memoryview of the item values.
+        """
+        self.bits = bits
+        self.total = total
+        self.values = values
+
+    def flip(self, i):
+        self.bits[i] ^= 1
+        if self.bits[i]:
+            self.total += self.values[i]
+        else:
+            self.total -= self.values[i]
+
+    def splice(self, donor, start, end):
+        """
+        Copy donor[start:end] over this genome's bits, adjusting the sum by the segment difference.
+        """
+        old = self.bits[start:end]
+        new = donor[start:end]
+        if old == new:
+            return
+        segment = self.values[start:end]
+        self.total += sum(compress(segment, new)) - sum(compress(segment, old))
+        self.bits[start:end] = new
+
+
+class Population:
+    """
+    A whole generation of genomes stored as one flat (pop_size x num_items) matrix of 0/1 bytes.
+
+    Row i of the matrix is genome i, and every genome's item sum is computed against a single
+    array of item values, so no per-genome Python lists are ever built.
+    """
+    def __init__(self, values, genes=None):
+        """
+        :param values: An array of item values, one per column of the matrix.
+        :param genes: An optional bytearray holding the rows of the matrix back to back.
+        """
+        self.values = values
+        self.num_items = len(values)
+        self.genes = bytearray() if genes is None else genes
+        # The known item sum of each row, or None where it still has to be computed
+        self.totals = [None] * (len(self.genes) // self.num_items)
+
+    @classmethod
+    def random(cls, values, size, density, rng=random):
+        """
+        Build a population of size random genomes where each bit is set with probability density
+        (to the nearest 1/256, as random bytes are mapped to bits through a lookup table).
+        """
+        threshold = round(density * 256)
+        table = bytes(b < threshold for b in range(256))
+        return cls(values, bytearray(rng.randbytes(len(values) * size)).translate(table))
+
+    def __len__(self):
+        return len(self.genes) // self.num_items
+
+    def row(self, i):
+        """
+        Return genome i as a read-only view into the matrix (no copy is made).
+        """
+        start = i * self.num_items
+        return memoryview(self.genes)[start:start + self.num_items].toreadonly()
+
+    def genome(self, i):
+        """
+        Return a copy of genome i that tracks its own sum (sums() must have been called first).
+        """
+        return Genome(bytearray(self.row(i)), self.totals[i], memoryview(self.values))
+
+    def replace(self, i, genome, total):
+        start = i * self.num_items
+        self.genes[start:start + self.num_items] = genome
+        self.totals[i] = total
+
+    def append(self, genome, total=None):
+        """
+        Add a row to the matrix. Genome objects bring their running sum with them.
+        """
+        if isinstance(genome, Genome):
+            self.genes += genome.bits
+            self.totals.append(genome.total)
+        else:
+            self.genes += genome
+            self.totals.append(total)
+
+    def sums(self):
+        """
+        Compute the item sum of every genome in one pass over the matrix (a matrix-vector product
+        of the 0/1 genes against the item values).
+
+        Rows whose sum is already known (elites, and children whose sum Genome tracked
+        incrementally) are not summed again, so after the first generation nothing is.
+        """
+        values = self.values
+        n = self.num_items
+        view = memoryview(self.genes)
+        totals = self.totals
+        for i, start in enumerate(range(0, len(self.genes), n)):
+            if totals[i] is None:
+                totals[i] = sum(compress(values, view[start:start + n]))
+        return list(totals)
+
+
+class WeightedSampler:
+    """
+    Draws indices with probability proportional to their weights.
+
+    The cumulative weight table is built once (O(n)) and each draw is a binary search over it
+    (O(log n)), so a whole generation's parents cost O(pop_size log pop_size).
+    """
+    def __init__(self, weights, rng=random):
+        self.cumulative = list(accumulate(weights))
+        self.indices = range(len(self.cumulative))
+        self.rng = rng
+        # With no weight anywhere every index is equally likely
+        if not self.cumulative or self.cumulative[-1] <= 0:
+            self.cumulative = None
+
+    def sample(self, k):
+        """
+        Draw k indices (with replacement) in one batched call.
+        """
+        return self.rng.choices(self.indices, cum_weights=self.cumulative, k=k)
+
+
+def random_instance(n=num_items, rng=random):
+    """
+    Generate a Knapsack instance without any UI: n distinct item values and a target that is the
+    sum of a random frac_target share of them.
+
+    :return: A tuple (values, target).
+    """
+    values = random_values(n, rng)
+    target = sum(rng.sample(values, int(n * frac_target)))
+    return values, target
+
+
+def subset_sums_bitset(values, target):
+    """
+    Exact subset-sum by dynamic programming over a big-int bitset of reachable sums.
+
+    Bit s of reach is set when some subset of the items so far sums to s. Only sums up to
+    2 * target are kept, since no larger sum can be closer to the target than the empty set.
+    Adding an item newly reaches the sums (reach << value) & ~reach, and each of those records the
+    item in first, which is all the memory reconstruction needs: O(target), not one bitset per item.
+
+    :return: A tuple (selected item indices, their sum).
+    """
+    size = 2 * target + 1
+    mask = (1 << size) - 1
+    # first[s] is the item that first made sum s reachable
+    first = array('i', bytes(4 * size))
+    reach = 1
+    for i, value in enumerate(values):
+        new = (reach << value) & ~reach & mask
+        if not new:
+            continue
+        reach |= new
+        # Only the 64-bit words holding new sums are visited in Python: the span between the lowest
+        #   and highest new sum is cut out, and its nonzero words found by compress()
+        base = ((new & -new).bit_length() - 1) // 64
+        words = range(base, (new.bit_length() + 63) // 64)
+        new_words = array('Q', (new >> (64 * base)).to_bytes(8 * len(words), 'little'))
+        if sys.byteorder != 'little':
+            new_words.byteswap()
+        for w, word in zip(compress(words, new_words), compress(new_words, new_words)):
+            while word:
+                low = word & -word
+                first[w * 64 + low.bit_length() - 1] = i
+                word ^= low
+        # Nothing can beat hitting the target exactly, and the items after this one are not needed
+        if reach >> target & 1:
+            break
+
+    # The closest reachable sum at or below the target, and the closest above it
+    below = (reach & ((1 << (target + 1)) - 1)).bit_length() - 1
+    above = reach >> target
+    best = below
+    if above:
+        above = target + (above & -above).bit_length() - 1
+        if above - target < target - below:
+            best = above
+
+    # Sum s was first reached by item first[s] from s - value, which items before it already
+    #   reached, so following first back to 0 picks distinct items in decreasing order
+    selected = []
+    remaining = best
+    while remaining:
+        i = first[remaining]
+        selected.append(i)
+        remaining -= values[i]
+    selected.reverse()
+    return selected, best
+
+
+def subset_sums_mitm(values, target):
+    """
+    Exact subset-sum by meet-in-the-middle: enumerate the subset sums of each half of the items,
+    then match every sum of the first half with the closest complement in the sorted second half.
+
+    :return: A tuple (selected item indices, their sum).
+    """
+    def enumerate_sums(half):
+        sums = [(0, 0)]
+        for bit, value in enumerate(half):
+            sums += [(total + value, mask | (1 << bit)) for total, mask in sums]
+        return sums
+
+    mid = len(values) // 2
+    left = enumerate_sums(values[:mid])
+    right = sorted(enumerate_sums(values[mid:]))
+    right_sums = [total for total, _ in right]
+
+    best = None
+    for total, mask in left:
+        i = bisect.bisect_left(right_sums, target - total)
+        for j in (i - 1, i):
+            if 0 <= j < len(right):
+                candidate = total + right_sums[j]
+                if best is None or abs(candidate - target) < abs(best[0] - target):
+                    best = (candidate, mask, right[j][1])
+        if best[0] == target:
+            break
+
+    best_sum, left_mask, right_mask = best
+    selected = [i for i in range(mid) if left_mask >> i & 1]
+    selected += [mid + i for i in range(len(values) - mid) if right_mask >> i & 1]
+    return selected, best_sum
+
+
+def solve_exact(values, target):
+    """
+    Find the subset of items whose sum is as close to target as possible.
+
+    Uses the reachable-sums bitset when its tables fit in max_bitset_bits, and meet-in-the-middle
+    when the sum range is too large but there are at most max_mitm_items items.
+
+    :return: A tuple (selected item indices, their sum).
+    :raises ValueError: If the instance is too large for both methods.
+    """
+    values = list(values)
+    if 33 * (2 * target + 1) <= max_bitset_bits:
+        return subset_sums_bitset(values, target)
+    if len(values) <= max_mitm_items:
+        return subset_sums_mitm(values, target)
+    raise ValueError(f'{len(values)} items with target {target} is too large to solve exactly')
+
+
+class GeneticSolver:
+    """
+    The Knapsack genetic algorithm, independent of any UI.
+
+    Each call to step() evolves one generation and returns that generation's statistics, so the
+    solver can be driven by the Tk event loop, a worker thread or a plain batch loop alike.
+    """
+    def __init__(self, values, target, seed=None, size=pop_size, elites=elitism_count,
+                 mutation=mutation_rate):
+        """
+        :param values: The item values.
+        :param target: The sum the selected items should get as close to as possible.
+        :param seed: Seed for the solver's private random generator, for reproducible runs.
+        :param size: Number of genomes per generation.
+        :param elites: Number of best fitness values carried over unchanged each generation.
+        :param mutation: Probability that a child gets a single bit flipped.
+        """
+        self.values = array('q', values)
+        self.target = target
+        self.rng = random.Random(seed)
+        self.size = size
+        self.elites = elites
+        self.mutation = mutation
+        self.population = None
+        self.fitnesses = None
+        self.generation = -1
+        self.best_bits = None
+        self.best_sum = None
+        self.best_fitness = None
+        # Every genome's sum is computed once: elites, children and immigrants bring theirs along,
+        #   and these count how many sums were computed against how many were carried over
+        self.sums_computed = 0
+        self.sums_reused = 0
+
+    def next_population(self, last_pop, fitnesses):
+        rng = self.rng
+        population = Population(self.values)
+        # elitism
+        elites = sorted(fitnesses)[:self.elites]
+        for i in range(len(last_pop)):
+            if fitnesses[i] in elites:
+                population.append(last_pop.row(i), last_pop.totals[i])
+
+        min_fitness = min(fitnesses)
+        weights = []
+        for fit in fitnesses:
+            if fit == 0.0:
+                weights.append(1.0)
+            else:
+                weights.append(min_fitness / fit)
+
+        def crossover(parent1, parent2):
+            # The child starts as a copy of parent1 (sum included) and only the swapped-in
+            # segment of parent2 changes its sum
+            g_out = last_pop.genome(parent1)
+            length = len(g_out.bits)
+            x = rng.randint(0, length // 2)
+            y = x + length // 2
+            g_out.splice(last_pop.row(parent2), x + 1, y + 1)
+            return g_out
+
+        def mutate(g_out):
+            g_out.flip(rng.randint(0, len(g_out.bits) - 1))
+            return g_out
+
+        # select all parent pairs for the generation at once by weighted selection
+        # note no guarantee of uniqueness - could get the same parent twice
+        # each genome is kept with probability 1 - weight (the old rejection loop redrew while
+        #   random() < weight), so the sampler draws in proportion to that directly
+        num_children = max(0, self.size - len(population))
+        sampler = WeightedSampler([1.0 - weight for weight in weights], rng)
+        parents = sampler.sample(2 * num_children)
+
+        # fill generation with new individuals
+        for i in range(0, len(parents), 2):
+            # perform crossover to generate new individual
+            baby = crossover(parents[i], parents[i + 1])
+            # potentially perform mutation
+            if rng.random() < self.mutation:
+                baby = mutate(baby)
+            # add to next generation
+            population.append(baby)
+
+        return population
+
+    def step(self):
+        """
+        Evolve one generation (the first call creates the random initial population).
+
+        :return: A dict of statistics for the generation.
+        """
+        if self.population is None:
+            self.population = Population.random(self.values, self.size, frac_target, self.rng)
         else:
-            canvas.create_rectangle(self.x,
-                                    self.y,
-                                    self.x+self.w,
-                                    self.y+self.h,
-                                    fill='',
-                                    outline=self.color,
-                                    width=stroke_width)
+            self.population = self.next_population(self.population, self.fitnesses)
+        self.generation += 1
+
+        # Every genome's sum comes out of a single pass over the population matrix
+        computed = self.population.totals.count(None)
+        sums = self.population.sums()
+        self.sums_computed += computed
+        self.sums_reused += len(sums) - computed
+        self.fitnesses = [abs(item_sum - self.target) for item_sum in sums]
+        best = min(range(len(self.fitnesses)), key=self.fitnesses.__getitem__)
+        if self.best_fitness is None or self.fitnesses[best] < self.best_fitness:
+            self.best_bits = bytes(self.population.row(best))
+            self.best_sum = sums[best]
+            self.best_fitness = self.fitnesses[best]
+
+        return {
+            'generation': self.generation,
+            'best_fitness': self.fitnesses[best],
+            'best_sum': sums[best],
+            'mean_fitness': sum(self.fitnesses) / len(self.fitnesses),
+            'sums_computed': self.sums_computed,
+            'sums_reused': self.sums_reused,
+        }
+
+    def solved(self):
+        return self.best_fitness == 0
+
+    def emigrants(self, count):
+        """
+        Return copies of the count best genomes of the current generation as (bits, sum) pairs.
+        """
+        order = sorted(range(len(self.fitnesses)), key=self.fitnesses.__getitem__)
+        return [(bytes(self.population.row(i)), self.population.totals[i]) for i in order[:count]]
+
+    def immigrate(self, genomes):
+        """
+        Replace the worst genomes of the current generation with (bits, sum) pairs from elsewhere.
+        """
+        order = sorted(range(len(self.fitnesses)), key=self.fitnesses.__getitem__, reverse=True)
+        for i, (bits, total) in zip(order, genomes):
+            self.population.replace(i, bits, total)
+            self.fitnesses[i] = abs(total - self.target)
+            if self.fitnesses[i] < self.best_fitness:
+                self.best_bits = bits
+                self.best_sum = total
+                self.best_fitness = self.fitnesses[i]
+
+    def run(self, generations=num_generations, callback=None):
+        """
+        Evolve up to generations generations, stopping early at the global optimum (fitness 0).
+
+        :param callback: Optional function called with each generation's statistics.
+        :return: The list of per-generation statistics.
+        """
+        history = []
+        for _ in range(generations):
+            stats = self.step()
+            history.append(stats)
+            if callback is not None:
+                callback(stats)
+            if self.solved():
+                break
+        return history
+
+    def result(self):
+        return {
+            'target': self.target,
+            'best_sum': self.best_sum,
+            'best_fitness': self.best_fitness,
+            'generations': self.generation + 1,
+            # A solver that never stepped has no best genome yet
+            'selected': [i for i, bit in enumerate(self.best_bits or b'') if bit],
+        }
+
+
+def evolve_island(solver, generations):
+    """
+    Process pool entry point: evolve one island for a number of generations and send it back.
+    """
+    solver.run(generations)
+    return solver
+
+
+def run_islands(values, target, islands=num_islands, generations=num_generations,
+                interval=migration_interval, migrants=migration_count, topology=migration_topology,
+                seed=None, size=pop_size):
+    """
+    Run the island-model GA: islands independent GeneticSolvers, each evolved in its own process
+    for interval generations at a time. Between epochs every island sends its migrants best genomes
+    to its neighbour ('ring') or to every other island ('full'), where they replace the worst.
+
+    :return: A tuple (best solver, per-epoch statistics).
+    """
+    if topology not in ('ring', 'full'):
+        raise ValueError(f'Unknown migration topology {topology!r}')
+    if interval < 1:
+        raise ValueError(f'Islands must evolve at least one generation between migrations, not {interval}')
+    if migrants < 0:
+        raise ValueError(f'Cannot send {migrants} migrants')
+    rng = random.Random(seed)
+    solvers = [GeneticSolver(values, target, seed=rng.randrange(2 ** 32), size=size) for _ in range(islands)]
+    history = []
+    done = 0
+    with ProcessPoolExecutor(max_workers=islands) as pool:
+        while done < generations:
+            epoch = min(interval, generations - done)
+            solvers = list(pool.map(evolve_island, solvers, [epoch] * islands))
+            done += epoch
+            best = min(solvers, key=lambda s: s.best_fitness)
+            history.append({'generation': done - 1, 'best_fitness': best.best_fitness, 'best_sum': best.best_sum})
+            if best.solved():
+                break
+
+            outgoing = [solver.emigrants(migrants) for solver in solvers]
+            for i, solver in enumerate(solvers):
+                if topology == 'ring':
+                    solver.immigrate(outgoing[i - 1])
+                else:
+                    solver.immigrate([genome for j, genomes in enumerate(outgoing) if j != i for genome in genomes])
+    return min(solvers, key=lambda s: s.best_fitness), history
+
+
+class SolverWorker(threading.Thread):
+    """
+    Runs a GeneticSolver on its own thread and publishes best-so-far snapshots through a bounded
+    queue, which the UI drains on a timer. The queue never blocks the solver: when it is full the
+    oldest snapshot is dropped, since only the latest one matters for display.
+    """
+    def __init__(self, solver, generations=num_generations, delay=sleep_time):
+        threading.Thread.__init__(self, daemon=True)
+        self.solver = solver
+        self.generations = generations
+        self.delay = delay
+        self.snapshots = queue.Queue(maxsize=snapshot_queue_size)
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self.cancelled = threading.Event()
+
+    def pause(self):
+        self.resumed.clear()
+
+    def resume(self):
+        self.resumed.set()
+
+    def cancel(self):
+        self.cancelled.set()
+        # Wake the thread if it is paused so that it can exit
+        self.resumed.set()
+
+    def publish(self, snapshot):
+        while True:
+            try:
+                self.snapshots.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.snapshots.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        solver = self.solver
+        last_best = None
+        stats = None
+        while solver.generation + 1 < self.generations and not solver.solved():
+            self.resumed.wait()
+            if self.cancelled.is_set():
+                break
+            stats = solver.step()
+            # Only improvements are worth sending to the UI
+            if solver.best_fitness != last_best:
+                last_best = solver.best_fitness
+                self.publish({'done': False, 'bits': solver.best_bits, 'sum': solver.best_sum, **stats})
+            if self.delay:
+                time.sleep(self.delay)
+        self.publish({'done': True, 'bits': solver.best_bits, 'sum': solver.best_sum,
+                      'cancelled': self.cancelled.is_set(), **(stats or {})})
+
+
+class ExactWorker(SolverWorker):
+    """
+    Runs solve_exact on its own thread, so that a large instance does not freeze the UI, and
+    publishes the optimal subset as a single final snapshot in the same form as SolverWorker's.
+    solve_exact cannot be interrupted, so a cancelled run finishes but its result is ignored.
+    """
+    def __init__(self, values, target):
+        SolverWorker.__init__(self, None, delay=0)
+        self.values = values
+        self.target = target
+
+    def run(self):
+        try:
+            selected, best_sum = solve_exact(self.values, self.target)
+        except ValueError as e:
+            print(e)
+            self.publish({'done': True, 'bits': None, 'sum': None, 'cancelled': self.cancelled.is_set()})
+            return
+        bits = bytearray(len(self.values))
+        for i in selected:
+            bits[i] = 1
+        self.publish({'done': True, 'bits': bytes(bits), 'sum': best_sum, 'generation': 'exact',
+                      'best_fitness': abs(best_sum - self.target), 'cancelled': self.cancelled.is_set()})
 
 
 class UI(tk.Tk):
@@ -82,7 +666,16 @@ class UI(tk.Tk):
         self.canvas = Canvas(self)
         self.canvas.place(x=0, y=0, width=self.width, height=self.height)
 
-        self.items_list = []
+        self.items = None
+        self.genome = b''
+        self.slots = []
+        self.slot_bits = bytearray()
+        self.first_item = 0
+        self.target_rect = None
+        self.pending_frame = None
+        self.frame_scheduled = False
+        self.last_frame = 0.0
+        self.worker = None
 
         # We create a standard banner menu bar and attach it to the window
         menu_bar = Menu(self)
@@ -96,6 +689,11 @@ class UI(tk.Tk):
         menu_bar.add_cascade(menu=menu_K, label='Knapsack', underline=0)
 
         def generate():
+            # A run on the old items would keep drawing its genomes onto the new grid
+            if self.worker is not None:
+                self.worker.cancel()
+                self.worker = None
+            self.pending_frame = None
             self.generate_knapsack()
             self.draw_items()
         # The add_command function adds an item to a menu, as opposed to add_cascade which adds a sub-menu
@@ -106,231 +704,372 @@ class UI(tk.Tk):
         self.target = 0
 
         def set_target():
-            target_set = []
-            for x in range(int(num_items * frac_target)):
-                item = self.items_list[random.randint(0, len(self.items_list)-1)]
-                while item in target_set:
-                    item = self.items_list[random.randint(0, len(self.items_list) - 1)]
-                target_set.append(item)
-            total = 0
-            for item in target_set:
-                total += item.value
-            self.target = total
+            values = self.items.values
+            self.target = sum(random.sample(values, int(len(values) * frac_target)))
             self.draw_target()
         menu_K.add_command(label="Get Target", command=set_target, underline=0)
 
         def start_thread():
-            thread = threading.Thread(target=self.run, args=())
-            thread.start()
+            self.run()
         menu_K.add_command(label="Run", command=start_thread, underline=0)
 
-        # We have to call self.mainloop() in our constructor (__init__) to start the UI loop and display the window
-        self.mainloop()
+        def pause():
+            if self.worker is not None:
+                self.worker.pause()
+        menu_K.add_command(label="Pause", command=pause, underline=0)
 
-    def get_rand_item(self):
-        i1 = Item()
-        for i2 in self.items_list:
-            if i1.value == i2.value:
-                return None
-        return i1
+        def resume():
+            if self.worker is not None:
+                self.worker.resume()
+        menu_K.add_command(label="Resume", command=resume, underline=1)
 
-    def add_item(self):
-        item = self.get_rand_item()
-        while item is None:
-            item = self.get_rand_item()
-        self.items_list.append(item)
+        def cancel():
+            if self.worker is not None:
+                self.worker.cancel()
+        menu_K.add_command(label="Cancel", command=cancel, underline=0)
 
-    def generate_knapsack(self):
-        for i in range(num_items):
-            self.add_item()
+        def solve():
+            if self.worker is not None:
+                self.worker.cancel()
+            # The exact search can take seconds, so it runs on a thread like the GA
+            self.worker = ExactWorker(self.items.values, self.target)
+            self.worker.start()
+            self.poll_worker(self.worker)
+        menu_K.add_command(label="Solve Exact", command=solve, underline=0)
 
-        item_max = 0
-        item_min = 9999
-        for item in self.items_list:
-            item_min = min(item_min, item.value)
-            item_max = max(item_max, item.value)
+        # Scroll through the item grid a column at a time, or a page at a time
+        self.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.bind('<Button-4>', lambda e: self.scroll(-1))
+        self.bind('<Button-5>', lambda e: self.scroll(1))
+        self.bind('<Prior>', lambda e: self.scroll(-6))
+        self.bind('<Next>', lambda e: self.scroll(6))
+
+        # We have to call self.mainloop() in our constructor (__init__) to start the UI loop and display the window
+        self.mainloop()
+
+    def generate_knapsack(self):
+        self.items = ItemSet.random(num_items)
+        self.genome = bytes(len(self.items))
+        self.first_item = 0
 
         w = self.width - screen_padding
         h = self.height - screen_padding
-        num_rows = math.ceil(num_items / 6)
-        row_w = w / 8 - item_padding
-        row_h = (h - 200) / num_rows
-        # print(f'{w}, {h}, {num_rows}, {row_w}, {row_h}')
-        for x in range(0, 6):
-            for y in range(0, num_rows):
-                if x * num_rows + y >= num_items:
-                    break
-                item = self.items_list[x * num_rows + y]
-                item_w = row_w / 2
-                item_h = max(item.value / item_max * row_h, 1)
-                # print(f'{screen_padding+x*row_w+x*item_padding},'
-                #      f'{screen_padding+y*row_h+y*item_padding},'
-                #      f'{item_w},'
-                #      f'{item_h}')
-                item.place(screen_padding + x * row_w + x * item_padding,
-                           screen_padding + y * row_h + y * item_padding,
-                           item_w,
-                           item_h)
+        self.num_rows = max(1, min(math.ceil(len(self.items) / 6), int((h - 200) / min_row_height)))
+        self.row_w = w / 8 - item_padding
+        self.row_h = (h - 200) / self.num_rows
+        self.item_max = max(self.items.values)
 
     def clear_canvas(self):
         self.canvas.delete("all")
 
     def draw_items(self):
-        for item in self.items_list:
-            item.draw(self.canvas)
+        """
+        Create the canvas items for one page of the item grid, plus the bars and labels. Afterwards
+        the display is only ever updated in place, and scrolling rebinds the same items.
+        """
+        self.clear_canvas()
+        self.slots = []
+        for slot in range(6 * self.num_rows):
+            rect_id = self.canvas.create_rectangle(0, 0, 0, 0, fill='', width=stroke_width)
+            text_id = self.canvas.create_text(0, 0, text='')
+            self.slots.append((rect_id, text_id))
+        self.slot_bits = bytearray(len(self.slots))
+        self.target_rect = self.canvas.create_rectangle(0, 0, 0, 0, fill='black')
+        self.target_text = self.canvas.create_text(0, 0, text='', font=('Arial', 18))
+        self.sum_rect = self.canvas.create_rectangle(0, 0, 0, 0, fill='black')
+        self.sum_text = self.canvas.create_text(0, 0, text='', font=('Arial', 18))
+        x = (self.width - screen_padding) / 8 * 6
+        w = (self.width - screen_padding) / 8 - screen_padding
+        h = self.height / 4 * 3
+        self.gen_text = self.canvas.create_text(x + w, screen_padding + h + screen_padding*2, text='',
+                                                font=('Arial', 18))
+        self.page_text = self.canvas.create_text(screen_padding, self.height - screen_padding * 4, text='',
+                                                 anchor='w')
+        self.draw_page()
+        self.draw_target()
+
+    def draw_page(self):
+        """
+        Bind the page's canvas items to the items starting at self.first_item.
+        """
+        values = self.items.values
+        n = len(values)
+        item_w = self.row_w / 2
+        for slot, (rect_id, text_id) in enumerate(self.slots):
+            i = self.first_item + slot
+            if i >= n:
+                self.canvas.itemconfig(rect_id, state='hidden')
+                self.canvas.itemconfig(text_id, state='hidden')
+                continue
+            x = screen_padding + (slot // self.num_rows) * (self.row_w + item_padding)
+            y = screen_padding + (slot % self.num_rows) * (self.row_h + item_padding)
+            item_h = max(values[i] / self.item_max * self.row_h, 1)
+            color = self.items.color(i)
+            self.slot_bits[slot] = self.genome[i]
+            self.canvas.coords(rect_id, x, y, x + item_w, y + item_h)
+            self.canvas.itemconfig(rect_id, state='normal', outline=color, fill=color if self.genome[i] else '')
+            self.canvas.coords(text_id, x + item_w + item_padding + stroke_width*2, y + item_h/2)
+            self.canvas.itemconfig(text_id, state='normal', text=f'{values[i]}')
+        last = min(n, self.first_item + len(self.slots))
+        self.canvas.itemconfig(self.page_text, text=f'Items {self.first_item + 1}-{last} of {n}'
+                                                    f'{" (scroll for more)" if len(self.slots) < n else ""}')
+
+    def scroll(self, columns):
+        if self.items is None or not self.slots:
+            return
+        n = len(self.items)
+        last_first = max(0, math.ceil((n - len(self.slots)) / self.num_rows)) * self.num_rows
+        first = min(max(0, self.first_item + columns * self.num_rows), last_first)
+        if first != self.first_item:
+            self.first_item = first
+            self.draw_page()
 
     def draw_target(self):
+        if self.target_rect is None:
+            return
         x = (self.width - screen_padding) / 8 * 7
         y = screen_padding
         w = (self.width - screen_padding) / 8 - screen_padding
         h = self.height / 2 - screen_padding
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill='black')
-        self.canvas.create_text(x+w//2, y+h+screen_padding, text=f'{self.target}', font=('Arial', 18))
+        self.canvas.coords(self.target_rect, x, y, x + w, y + h)
+        self.canvas.coords(self.target_text, x+w//2, y+h+screen_padding)
+        self.canvas.itemconfig(self.target_text, text=f'{self.target}')
 
     def draw_sum(self, item_sum, target):
         x = (self.width - screen_padding) / 8 * 6
         y = screen_padding
         w = (self.width - screen_padding) / 8 - screen_padding
         h = self.height / 2 - screen_padding
-        # print(f'{item_sum} / {target} * {h} = {item_sum/target} * {h} = {item_sum/target*h}')
-        h *= (item_sum / target)
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill='black')
-        self.canvas.create_text(x+w//2, y+h+screen_padding, text=f'{item_sum} ({"+" if item_sum>target else "-"}{abs(item_sum-target)})', font=('Arial', 18))
+        h *= (item_sum / target) if target else 0
+        self.canvas.coords(self.sum_rect, x, y, x + w, y + h)
+        self.canvas.coords(self.sum_text, x+w//2, y+h+screen_padding)
+        self.canvas.itemconfig(self.sum_text,
+                               text=f'{item_sum} ({"+" if item_sum>target else "-"}{abs(item_sum-target)})')
 
     def draw_genome(self, genome, gen_num):
-        for i in range(num_items):
-            item = self.items_list[i]
-            active = genome[i]
-            item.draw(self.canvas, active)
-        x = (self.width - screen_padding) / 8 * 6
-        y = screen_padding
-        w = (self.width - screen_padding) / 8 - screen_padding
-        h = self.height / 4 * 3
-        self.canvas.create_text(x + w, y + h + screen_padding*2, text=f'Generation {gen_num}', font=('Arial', 18))
+        # Only the visible items whose state differs from what is on screen are touched
+        self.genome = genome
+        shown = self.slot_bits
+        first = self.first_item
+        for slot in range(min(len(self.slots), len(genome) - first)):
+            active = genome[first + slot]
+            if shown[slot] != active:
+                rect_id = self.slots[slot][0]
+                self.canvas.itemconfig(rect_id, fill=self.items.color(first + slot) if active else '')
+                shown[slot] = active
+        self.canvas.itemconfig(self.gen_text, text=f'Generation {gen_num}')
+
+    def show_genome(self, genome, item_sum, gen_num):
+        """
+        Queue a genome for display. Only the latest queued genome is drawn, at most max_fps times a
+        second, so rendering cost does not depend on how fast the solver produces generations.
+        """
+        self.pending_frame = (genome, item_sum, gen_num)
+        if self.frame_scheduled:
+            return
+        self.frame_scheduled = True
+        delay = self.last_frame + 1 / max_fps - time.perf_counter()
+        self.after(max(0, int(delay * 1000)), self.flush_frame)
+
+    def flush_frame(self):
+        self.frame_scheduled = False
+        if self.pending_frame is None:
+            return
+        self.last_frame = time.perf_counter()
+        genome, item_sum, gen_num = self.pending_frame
+        self.draw_sum(item_sum, self.target)
+        self.draw_genome(genome, gen_num)
 
     def run(self):
-        global pop_size
-        global num_generations
-
-        def gene_sum(genome):
-            total = 0
-            for i in range(len(genome) - 1):
-                if genome[i]:
-                    total += self.items_list[i].value
-            return total
-
-        def fitness(genome):
-            return abs(gene_sum(genome) - self.target)
-
-        def get_population(last_pop=None, fitnesses=None):
-            population = []
-            if last_pop is None:
-                for g in range(pop_size):
-                    genome = []
-                    for bit in range(num_items):
-                        genome.append(random.random() < frac_target)
-                    population.append(genome)
-                return population
-            else:
-                # elitism
-                elites = []
-                for e in range(elitism_count):
-                    elites.append(fitnesses[e])
-                for e in last_pop:
-                    if fitness(e) in elites:
-                        population.append(e)
-
-                def select_parents(min_fitness):
-                    weights = []
-                    for parent in last_pop:
-                        if fitness(parent) == 0.0:
-                            weights.append(1.0)
-                        else:
-                            weights.append(min_fitness / fitness(parent))
-
-                    def get_by_weight():
-                        idx = random.randint(0, pop_size - 1)
-                        while random.random() < weights[idx]:
-                            idx = random.randint(0, pop_size - 1)
-                        return last_pop[idx]
-
-                    return get_by_weight(), get_by_weight()
-
-                def crossover(parent1, parent2):
-                    length = len(parent1)
-                    x = random.randint(0, length // 2)
-                    y = x + length // 2
-                    g_out = []
-                    for i in range(length):
-                        if x < i <= y:
-                            g_out.append(parent2[i])
-                        else:
-                            g_out.append(parent1[i])
-                    if len(g_out) < num_items:
-                        print('Error!')
-                    return g_out
-
-                def mutate(g_in):
-                    x = random.randint(0, len(g_in) - 1)
-                    g_out = []
-                    for i in range(len(g_in)):
-                        if i == x:
-                            g_out.append(not g_in[i])
-                        else:
-                            g_out.append(g_in[i])
-                    return g_out
-
-                # fill generation with new individuals
-                while len(population) < pop_size:
-                    # select two random parents by weighted selection
-                    # note no guarantee of uniqueness - could get the same parent twice
-                    parents = select_parents(fitnesses[0])
-                    # perform crossover to generate new individual
-                    baby = crossover(parents[0], parents[1])
-                    # potentially perform mutation
-                    if random.random() < mutation_rate:
-                        baby = mutate(baby)
-                    # add to next generation
-                    population.append(baby)
-
-                return population
-
-        def generation_step(generation=0, pop=None):
-            if generation >= num_generations:
-                return  # Stop the process after the set number of generations
-
-            if pop is None:
-                pop = get_population()
-
-            fitnesses = []
-            best_of_gen = None
-            min_fitness = 9999
-            for genome in pop:
-                fit = fitness(genome)
-                if fit < min_fitness:
-                    best_of_gen = genome
-                    min_fitness = fit
-                fitnesses.append(fit)
-            fitnesses.sort()
-
-            print(f'Best fitness of generation {generation}: {min_fitness}')
-            print(best_of_gen)
+        if self.worker is not None:
+            self.worker.cancel()
+        solver = GeneticSolver(self.items.values, self.target)
+        # The GA runs on its own thread; the UI only picks up its snapshots on a timer
+        self.worker = SolverWorker(solver)
+        self.worker.start()
+        self.poll_worker(self.worker)
+
+    def poll_worker(self, worker):
+        """
+        Drain the worker's snapshot queue and display the most recent one, then check back later.
+        """
+        if worker is not self.worker:
+            return
+        snapshot = None
+        while True:
+            try:
+                snapshot = worker.snapshots.get_nowait()
+            except queue.Empty:
+                break
+        if snapshot is not None and snapshot['bits'] is not None:
+            print(f'Best fitness of generation {snapshot["generation"]}: {snapshot["best_fitness"]}')
+            if 'sums_computed' in snapshot:
+                print(f'Genome sums: {snapshot["sums_computed"]} computed, {snapshot["sums_reused"]} reused')
             print()
+            self.show_genome(snapshot['bits'], snapshot['sum'], snapshot['generation'])
+        if snapshot is None or not snapshot['done']:
+            self.after(int(1000 / max_fps), self.poll_worker, worker)
+
+
+def load_instance(path):
+    """
+    Read an instance from a JSON file of the form {"values": [...], "target": N}.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return data['values'], data['target']
+
+
+def write_results(results, path, fmt):
+    """
+    Write solver results to path (or stdout for '-') as JSON, or the per-generation stats as CSV.
+    """
+    out = sys.stdout if path == '-' else open(path, 'w', newline='')
+    try:
+        if fmt == 'json':
+            json.dump(results, out, indent=2)
+            out.write('\n')
+        else:
+            fields = ['instance', 'generation', 'best_fitness', 'best_sum', 'mean_fitness',
+                      'sums_computed', 'sums_reused']
+            writer = csv.DictWriter(out, fieldnames=fields)
+            writer.writeheader()
+            for result in results:
+                for stats in result['history']:
+                    writer.writerow({'instance': result['instance'], **stats})
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def compare_islands(name, values, target, args, seed):
+    """
+    Run the island model and, for reference, a single population as large as all islands combined
+    with the same generation budget, and report both solutions and the speedup.
+
+    Either run may stop early once it hits the target, after a different number of generations,
+    so the speedup compares time per generation rather than total wall-clock time.
+    """
+    start = time.perf_counter()
+    baseline = GeneticSolver(values, target, seed=seed, size=args.pop_size * args.islands)
+    baseline.run(args.generations)
+    baseline_seconds = time.perf_counter() - start
+    baseline_generations = baseline.generation + 1
+
+    start = time.perf_counter()
+    best, history = run_islands(values, target, islands=args.islands, generations=args.generations,
+                                interval=args.migration_interval, migrants=args.migrants,
+                                topology=args.topology, seed=seed, size=args.pop_size)
+    elapsed = time.perf_counter() - start
+    generations = history[-1]['generation'] + 1
+
+    result = best.result()
+    result.update(instance=name, seconds=elapsed, islands=args.islands, topology=args.topology,
+                  generations=generations, history=history,
+                  single_population={'best_sum': baseline.best_sum, 'best_fitness': baseline.best_fitness,
+                                     'generations': baseline_generations, 'seconds': baseline_seconds},
+                  speedup=(baseline_seconds / baseline_generations) / (elapsed / generations) if elapsed else None)
+    speedup = f' (speedup per generation {result["speedup"]:.2f}x)' if result['speedup'] else ''
+    print(f'{name}: {args.islands} islands reached {result["best_sum"]} for target {target} '
+          f'(off by {result["best_fitness"]}) in {generations} generations, {elapsed:.2f}s; a single population '
+          f'reached {baseline.best_sum} (off by {baseline.best_fitness}) in {baseline_generations} generations, '
+          f'{baseline_seconds:.2f}s{speedup}', file=sys.stderr)
+    return result
+
+
+def positive_int(text):
+    """
+    argparse type for counts that must be at least 1.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{text} is not a positive integer')
+    return value
+
+
+def non_negative_int(text):
+    """
+    argparse type for counts that may be 0.
+    """
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f'{text} is not a non-negative integer')
+    return value
+
 
-            # Schedule the UI updates in the main thread
-            self.after(0, self.clear_canvas)
-            self.after(0, self.draw_target)
-            self.after(0, self.draw_sum, gene_sum(best_of_gen), self.target)
-            self.after(0, self.draw_genome, best_of_gen, generation)
+def main(argv=None):
+    """
+    Headless batch mode: solve one or more instances with no Tk window and no sleep_time delay.
+    """
+    parser = argparse.ArgumentParser(description='Solve Knapsack instances without the UI.')
+    parser.add_argument('instances', nargs='*',
+                        help='JSON instance files ({"values": [...], "target": N}); '
+                             'a random instance is generated when none are given')
+    parser.add_argument('--items', type=positive_int, default=num_items, help='items in a generated instance')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--generations', type=positive_int, default=num_generations, help='generation budget')
+    parser.add_argument('--pop-size', type=positive_int, default=pop_size, help='genomes per generation')
+    parser.add_argument('--exact', action='store_true',
+                        help='solve exactly (bitset subset-sum / meet-in-the-middle) instead of the GA')
+    parser.add_argument('--islands', type=positive_int, default=1,
+                        help='run the island model with this many processes and compare it against '
+                             'a single population of the same total size')
+    parser.add_argument('--migration-interval', type=positive_int, default=migration_interval,
+                        help='generations between island migrations')
+    parser.add_argument('--migrants', type=non_negative_int, default=migration_count, help='genomes sent per migration')
+    parser.add_argument('--topology', choices=('ring', 'full'), default=migration_topology,
+                        help='island migration topology')
+    parser.add_argument('--output', default='-', help='output file (default: stdout)')
+    parser.add_argument('--format', choices=('json', 'csv'), default=None,
+                        help='output format (default: from the output file extension, else json)')
+    args = parser.parse_args(argv)
 
-            # Schedule the next generation step after a delay, unless we're at the global optimum (fitness == 0)
-            if fitnesses[0] != 0:
-                self.after(int(sleep_time * 1000), generation_step, generation + 1, get_population(pop, fitnesses))
+    fmt = args.format or ('csv' if args.output.endswith('.csv') else 'json')
+    rng = random.Random(args.seed)
+    if args.instances:
+        instances = [(path, *load_instance(path)) for path in args.instances]
+    else:
+        instances = [('random', *random_instance(args.items, rng))]
 
-        # Start the evolutionary process
-        generation_step()
+    results = []
+    for name, values, target in instances:
+        if args.exact:
+            start = time.perf_counter()
+            try:
+                selected, best_sum = solve_exact(values, target)
+            except ValueError as e:
+                print(f'{name}: {e}', file=sys.stderr)
+                results.append({'instance': name, 'target': target, 'error': str(e), 'history': []})
+                continue
+            elapsed = time.perf_counter() - start
+            results.append({'instance': name, 'target': target, 'best_sum': best_sum,
+                            'best_fitness': abs(best_sum - target), 'selected': selected,
+                            'seconds': elapsed, 'history': []})
+            print(f'{name}: exact best sum {best_sum} for target {target} in {elapsed * 1000:.1f} ms',
+                  file=sys.stderr)
+            continue
+        if args.islands > 1:
+            results.append(compare_islands(name, values, target, args, rng.randrange(2 ** 32)))
+            continue
+        solver = GeneticSolver(values, target, seed=rng.randrange(2 ** 32), size=args.pop_size)
+        start = time.perf_counter()
+        history = solver.run(args.generations)
+        elapsed = time.perf_counter() - start
+        result = solver.result()
+        result.update(instance=name, seconds=elapsed,
+                      generations_per_second=len(history) / elapsed if elapsed else None,
+                      history=history)
+        results.append(result)
+        rate = f', {result["generations_per_second"]:.0f} generations/s' if result['generations_per_second'] else ''
+        print(f'{name}: best sum {result["best_sum"]} for target {target} '
+              f'(off by {result["best_fitness"]}) after {result["generations"]} generations{rate}', file=sys.stderr)
+    write_results(results, args.output, fmt)
 
 
 # In python, we have this odd construct to catch the main thread and instantiate our Window class
 if __name__ == '__main__':
-    UI()
+    # With command-line arguments we run headless, otherwise we open the window
+    if len(sys.argv) > 1:
+        main()
+    else:
+        UI()
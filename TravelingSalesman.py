@@ -1,38 +1,1424 @@
+import argparse
+import heapq
+import json
 import math
+import mmap
+import operator
+import queue
 import random
+import struct
+import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import *
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left
+from itertools import accumulate, compress, repeat
 
 num_cities = 25
 num_roads = 100
 city_scale = 5
 road_width = 4
 padding = 100
+# The best tour is redrawn at most this many times a second
+max_fps = 20
+# The dense distance matrix is only built (on first use) for graphs up to this many cities;
+#   larger graphs compute distances from the coordinates on demand
+dense_limit = 4000
+# All-pairs shortest paths run Dijkstra from every city in a process pool above this many cities
+parallel_limit = 500
+# Local search only tries moves towards each city's num_candidates nearest cities
+num_candidates = 10
+
+# MAX-MIN Ant System parameters: ants per iteration, pheromone (alpha) and distance (beta)
+#   exponents, and the fraction of pheromone that evaporates each iteration
+num_ants = 20
+num_iterations = 200
+aco_alpha = 1.0
+aco_beta = 3.0
+aco_rho = 0.1
+
+# Solvers stop once their tour is provably within this fraction of optimal (tour cost against the
+#   Held-Karp lower bound); the bound is improved by this many subgradient iterations, for at most
+#   held_karp_seconds, and skipped altogether above held_karp_limit cities
+target_gap = 0.01
+held_karp_iterations = 100
+held_karp_seconds = 2.0
+held_karp_limit = 2000
+
+# Largest dynamic-programming table (in bytes) the exact solver may allocate; 256MB allows 21 cities
+exact_memory = 1 << 28
+
+# TSPLIB's Earth radius in km, for GEO distances
+tsplib_earth_radius = 6378.388
+
+# The binary instance format: this header (magic, version, weight type code, flags, city count,
+#   name, padded so the arrays stay 8-byte aligned), then little-endian float64 x and y coordinates and optionally the n x n weight matrix
+binary_magic = b'TSPB'
+binary_version = 1
+binary_header = struct.Struct('<4sHHIQ64s4x')
+binary_coords = 1
+binary_matrix = 2
+binary_suffix = '.tspb'
 
 
 class Node:
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.item = None
 
     def draw(self, canvas, color='black'):
-        canvas.create_oval(self.x-city_scale, self.y-city_scale, self.x+city_scale, self.y+city_scale, fill=color)
+        """
+        Create the city's canvas item once; later color changes go through recolor().
+        """
+        self.item = canvas.create_oval(self.x-city_scale, self.y-city_scale, self.x+city_scale, self.y+city_scale,
+                                       fill=color, tags='city')
+
+    def recolor(self, canvas, color):
+        canvas.itemconfig(self.item, fill=color)
 
 
 class Edge:
-    def __init__(self, a, b):
+    def __init__(self, a, b, length):
         self.city_a = a
         self.city_b = b
-        self.length = math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2)
+        self.length = length
+        self.item = None
 
     def draw(self, canvas, color='grey', style=(2, 4)):
-        canvas.create_line(self.city_a.x,
-                           self.city_a.y,
-                           self.city_b.x,
-                           self.city_b.y,
-                           fill=color,
-                           width=road_width,
-                           dash=style)
+        """
+        Create the road's canvas item once; later color changes go through recolor().
+        """
+        self.item = canvas.create_line(self.city_a.x,
+                                       self.city_a.y,
+                                       self.city_b.x,
+                                       self.city_b.y,
+                                       fill=color,
+                                       width=road_width,
+                                       dash=style)
+
+    def recolor(self, canvas, color='grey', style=(2, 4)):
+        canvas.itemconfig(self.item, fill=color, dash=style)
+
+
+def distance_matrix(xs, ys):
+    """
+    Build the dense matrix of straight-line distances between every pair of cities as one flat
+    float32 array (row a holds the distances from city a). Each row is produced by chaining C-level
+    map() calls over the coordinate arrays rather than by a Python loop over pairs.
+    """
+    n = len(xs)
+    matrix = array('f')
+    for xa, ya in zip(xs, ys):
+        matrix.extend(map(math.hypot, map(operator.sub, xs, repeat(xa, n)), map(operator.sub, ys, repeat(ya, n))))
+    return matrix
+
+
+class Graph:
+    """
+    The road network as flat arrays: city coordinates, the dense distance matrix and a CSR
+    (compressed sparse row) index of which cities each road connects.
+
+    The roads touching city a are adjacent[offsets[a]:offsets[a + 1]] (the neighbouring cities) and
+    road_ids over the same slice (their indices into roads), so neighbour lookups and tour
+    evaluation are plain array indexing.
+    """
+    def __init__(self, xs, ys, roads):
+        """
+        :param xs: The x coordinate of each city.
+        :param ys: The y coordinate of each city.
+        :param roads: A list of (a, b) city index pairs, one per road.
+        """
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+        self.n = len(self.xs)
+        self.roads = roads
+        self._distances = None
+        self._shortest = None
+        # Road lengths, parallel to roads
+        self.lengths = array('f', map(math.hypot,
+                                      (self.xs[a] - self.xs[b] for a, b in roads),
+                                      (self.ys[a] - self.ys[b] for a, b in roads)))
+
+        degree = [0] * self.n
+        for a, b in roads:
+            degree[a] += 1
+            degree[b] += 1
+        self.offsets = array('l', [0])
+        self.offsets.extend(accumulate(degree))
+        self.adjacent = array('l', [0]) * (2 * len(roads))
+        self.road_ids = array('l', self.adjacent)
+        fill = array('l', self.offsets[:-1])
+        for r, (a, b) in enumerate(roads):
+            self.adjacent[fill[a]] = b
+            self.road_ids[fill[a]] = r
+            fill[a] += 1
+            self.adjacent[fill[b]] = a
+            self.road_ids[fill[b]] = r
+            fill[b] += 1
+
+    @property
+    def distances(self):
+        """
+        The dense distance matrix, built on first use.
+        """
+        if self._distances is None:
+            self._distances = distance_matrix(self.xs, self.ys)
+        return self._distances
+
+    def distance(self, a, b):
+        if self.n > dense_limit:
+            return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+        return self.distances[a * self.n + b]
+
+    def neighbors(self, a):
+        """
+        Return the cities connected to a by a road.
+        """
+        return self.adjacent[self.offsets[a]:self.offsets[a + 1]]
+
+    def road_length(self, r):
+        return self.lengths[r]
+
+    def shortest_paths(self, processes=None):
+        """
+        Return the all-pairs shortest paths over the roads, computed on first use and then cached
+        for the lifetime of this graph.
+        """
+        if self._shortest is None:
+            self._shortest = ShortestPaths(self, processes)
+        return self._shortest
+
+    def tour_length(self, tour):
+        """
+        Total straight-line length of a closed tour given as a sequence of city indices.
+        """
+        if self.n > dense_limit:
+            return sum(map(self.distance, tour, tour[1:])) + self.distance(tour[-1], tour[0])
+        d = self.distances
+        n = self.n
+        return sum(d[a * n + b] for a, b in zip(tour, tour[1:])) + d[tour[-1] * n + tour[0]]
+
+
+def dijkstra(graph, source):
+    """
+    Single-source shortest paths over the roads, with a binary heap.
+
+    :return: A tuple of lists (dist, pred, via): the road distance from source to every city, the
+        city before it on the shortest path and the road leading to it from there (-1 for none).
+    """
+    n = graph.n
+    offsets, adjacent, road_ids, lengths = graph.offsets, graph.adjacent, graph.road_ids, graph.lengths
+    dist = [math.inf] * n
+    pred = [-1] * n
+    via = [-1] * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, a = heapq.heappop(heap)
+        if d > dist[a]:
+            continue
+        for k in range(offsets[a], offsets[a + 1]):
+            b = adjacent[k]
+            nd = d + lengths[road_ids[k]]
+            if nd < dist[b]:
+                dist[b] = nd
+                pred[b] = a
+                via[b] = road_ids[k]
+                heapq.heappush(heap, (nd, b))
+    return dist, pred, via
+
+
+_pool_graph = None
+
+
+def _init_pool_graph(graph):
+    global _pool_graph
+    _pool_graph = graph
+
+
+def _pool_dijkstra(source):
+    return dijkstra(_pool_graph, source)
+
+
+class ShortestPaths:
+    """
+    All-pairs shortest paths over the road network: the metric closure of the graph.
+
+    cost(a, b) is the length of the shortest road route between two cities, read from one flat
+    n x n array, and pred/via (same layout, row a for paths starting at a) reconstruct the route
+    itself, so a tour over the closure can be expanded back into the roads it actually drives.
+    """
+    def __init__(self, graph, processes=None):
+        """
+        :param graph: The Graph to solve.
+        :param processes: Worker processes for the per-city Dijkstra runs; by default a pool is
+            used above parallel_limit cities and everything runs in this process below it.
+        """
+        n = graph.n
+        self.graph = graph
+        self.n = n
+        self.dist = array('d')
+        self.pred = array('l')
+        self.via = array('l')
+        if processes is None and n <= parallel_limit:
+            rows = (dijkstra(graph, source) for source in range(n))
+            self._collect(rows)
+        else:
+            with ProcessPoolExecutor(processes, initializer=_init_pool_graph, initargs=(graph,)) as pool:
+                self._collect(pool.map(_pool_dijkstra, range(n), chunksize=max(1, n // 64)))
+
+    def _collect(self, rows):
+        for dist, pred, via in rows:
+            self.dist.extend(dist)
+            self.pred.extend(pred)
+            self.via.extend(via)
+
+    def cost(self, a, b):
+        return self.dist[a * self.n + b]
+
+    def path(self, a, b):
+        """
+        Return the cities on the shortest route from a to b, both included.
+        """
+        row = a * self.n
+        cities = [b]
+        while b != a:
+            b = self.pred[row + b]
+            cities.append(b)
+        cities.reverse()
+        return cities
+
+    def path_roads(self, a, b):
+        """
+        Return the road indices on the shortest route from a to b.
+        """
+        row = a * self.n
+        roads = []
+        while b != a:
+            roads.append(self.via[row + b])
+            b = self.pred[row + b]
+        roads.reverse()
+        return roads
+
+    def tour_cost(self, tour):
+        d = self.dist
+        n = self.n
+        return sum(d[a * n + b] for a, b in zip(tour, tour[1:])) + d[tour[-1] * n + tour[0]]
+
+    def expand_tour(self, tour):
+        """
+        Expand a closed tour over the metric closure into the sequence of roads it drives.
+        """
+        roads = []
+        for a, b in zip(tour, tour[1:] + tour[:1]):
+            roads += self.path_roads(a, b)
+        return roads
+
+
+class SpatialGrid:
+    """
+    A uniform grid over the city coordinates, about two cities per cell, for k-nearest and radius
+    queries that only look at the cells around the query point instead of every city.
+
+    Building it is a single bucketing pass, O(n). Cities can be removed (for nearest-unvisited
+    queries while constructing a tour) and queries then skip them.
+    """
+    def __init__(self, xs, ys):
+        self.xs = xs
+        self.ys = ys
+        n = len(xs)
+        self.x0, self.y0 = min(xs), min(ys)
+        width = max(max(xs) - self.x0, 1e-9)
+        height = max(max(ys) - self.y0, 1e-9)
+        self.cell = max(math.sqrt(width * height * 2 / max(n, 1)), 1e-9)
+        self.cols = int(width / self.cell) + 1
+        self.rows = int(height / self.cell) + 1
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        for i, cell in enumerate(map(self.cell_of, xs, ys)):
+            self.cells[cell].append(i)
+
+    def cell_of(self, x, y):
+        cx = min(max(int((x - self.x0) / self.cell), 0), self.cols - 1)
+        cy = min(max(int((y - self.y0) / self.cell), 0), self.rows - 1)
+        return cy * self.cols + cx
+
+    def remove(self, i):
+        self.cells[self.cell_of(self.xs[i], self.ys[i])].remove(i)
+
+    def _ring(self, cx, cy, r):
+        """
+        Yield the cities in the square ring of cells at Chebyshev distance r from cell (cx, cy).
+        """
+        cols, rows, cells = self.cols, self.rows, self.cells
+        for y in range(max(cy - r, 0), min(cy + r, rows - 1) + 1):
+            if y == cy - r or y == cy + r:
+                xs = range(max(cx - r, 0), min(cx + r, cols - 1) + 1)
+            else:
+                xs = [x for x in (cx - r, cx + r) if 0 <= x < cols]
+            for x in xs:
+                yield from cells[y * cols + x]
+
+    def nearest(self, x, y, k=1, exclude=-1):
+        """
+        Return the k cities nearest to (x, y), nearest first (exclude is skipped, e.g. the city
+        at the query point itself).
+        """
+        cx = min(max(int((x - self.x0) / self.cell), 0), self.cols - 1)
+        cy = min(max(int((y - self.y0) / self.cell), 0), self.rows - 1)
+        xs, ys = self.xs, self.ys
+        found = []
+        max_r = max(self.cols, self.rows)
+        for r in range(max_r + 1):
+            for i in self._ring(cx, cy, r):
+                if i != exclude:
+                    found.append((math.hypot(xs[i] - x, ys[i] - y), i))
+            if len(found) >= k:
+                # Anything outside the searched square is at least this far from the query point
+                reach = min(x - (self.x0 + (cx - r) * self.cell), self.x0 + (cx + r + 1) * self.cell - x,
+                            y - (self.y0 + (cy - r) * self.cell), self.y0 + (cy + r + 1) * self.cell - y)
+                found.sort()
+                if found[k - 1][0] <= reach:
+                    break
+        found.sort()
+        return [i for _, i in found[:k]]
+
+    def radius(self, x, y, r):
+        """
+        Return every city within distance r of (x, y).
+        """
+        xs, ys, cols, cells = self.xs, self.ys, self.cols, self.cells
+        x_lo = max(int((x - r - self.x0) / self.cell), 0)
+        x_hi = min(int((x + r - self.x0) / self.cell), self.cols - 1)
+        y_lo = max(int((y - r - self.y0) / self.cell), 0)
+        y_hi = min(int((y + r - self.y0) / self.cell), self.rows - 1)
+        return [i for cy in range(y_lo, y_hi + 1) for cx in range(x_lo, x_hi + 1)
+                for i in cells[cy * cols + cx] if math.hypot(xs[i] - x, ys[i] - y) <= r]
+
+    def candidate_lists(self, k=num_candidates):
+        """
+        Return every city's k nearest other cities, nearest first (the LocalSearch candidates).
+        """
+        return [self.nearest(x, y, k, exclude=i) for i, (x, y) in enumerate(zip(self.xs, self.ys))]
+
+    def nearest_neighbor_tour(self, start=0):
+        """
+        Build a tour by always driving to the nearest unvisited city. This empties the grid.
+        """
+        xs, ys = self.xs, self.ys
+        tour = [start]
+        self.remove(start)
+        for _ in range(len(xs) - 1):
+            a = tour[-1]
+            b = self.nearest(xs[a], ys[a])[0]
+            self.remove(b)
+            tour.append(b)
+        return tour
+
+
+def candidate_lists(n, cost, k=num_candidates):
+    """
+    Return, for every city, its k cheapest other cities by cost(a, b), nearest first.
+
+    This is the brute-force O(n^2 log k) construction, suitable for the metric closure of a road
+    network; for straight-line distances SpatialGrid.candidate_lists() is much faster.
+    """
+    cities = range(n)
+    lists = []
+    for a in cities:
+        near = heapq.nsmallest(k + 1, cities, key=lambda b: cost(a, b))
+        lists.append([b for b in near if b != a][:k])
+    return lists
+
+
+class LocalSearch:
+    """
+    2-opt and Or-opt local search over a closed tour.
+
+    The tour is an array of cities plus a position index (pos[city] is its place in the tour), so
+    a city's successor and predecessor are O(1), and reversing a path always flips whichever side
+    of the tour is shorter. Moves are only tried towards each city's candidate (nearest) cities,
+    and don't-look bits keep cities whose neighbourhood has not changed out of the work queue, so
+    a pass costs roughly O(n * k) instead of the O(n^2) of full-neighbourhood 2-opt.
+    """
+    def __init__(self, cost, candidates, tour):
+        """
+        :param cost: A function cost(a, b) giving the cost of travelling between two cities.
+        :param candidates: For every city, a list of nearby cities, nearest first.
+        :param tour: The initial tour as a sequence of city indices.
+        """
+        self.cost = cost
+        self.candidates = candidates
+        self.tour = array('l', tour)
+        self.n = len(self.tour)
+        self.pos = array('l', [0]) * self.n
+        for i, city in enumerate(self.tour):
+            self.pos[city] = i
+        self.moves = 0
+
+    def next(self, city):
+        i = self.pos[city] + 1
+        return self.tour[0 if i == self.n else i]
+
+    def prev(self, city):
+        return self.tour[self.pos[city] - 1]
+
+    def length(self):
+        cost = self.cost
+        tour = self.tour
+        return sum(cost(tour[i - 1], tour[i]) for i in range(self.n))
+
+    def reverse_path(self, u, v):
+        """
+        Reverse the path running forward from city u to city v. When that path is longer than half
+        the tour, the rest of the tour is reversed instead, which gives the same cycle.
+        """
+        n = self.n
+        tour, pos = self.tour, self.pos
+        i, j = pos[u], pos[v]
+        size = (j - i) % n + 1
+        if 2 * size > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            size = n - size
+        for _ in range(size // 2):
+            a, b = tour[i], tour[j]
+            tour[i], tour[j] = b, a
+            pos[b], pos[a] = i, j
+            i += 1
+            if i == n:
+                i = 0
+            j -= 1
+            if j < 0:
+                j = n - 1
+
+    def move(self, a, b, c, d):
+        """
+        Replace the tour edges (a, b) and (c, d) with (a, c) and (b, d). The edges must run the
+        same way round the tour (b follows a exactly when d follows c).
+        """
+        if self.next(a) == b:
+            self.reverse_path(b, c)
+        else:
+            self.reverse_path(c, b)
+        self.moves += 1
+
+    def try_2opt(self, a):
+        cost = self.cost
+        for succ in (True, False):
+            b = self.next(a) if succ else self.prev(a)
+            d_ab = cost(a, b)
+            for c in self.candidates[a]:
+                d_ac = cost(a, c)
+                # Candidates are sorted, so once the new edge is no shorter than the old one no
+                #   later candidate can give an improving move either
+                if d_ac >= d_ab:
+                    break
+                d = self.next(c) if succ else self.prev(c)
+                if c == b or d == a:
+                    continue
+                if d_ac + cost(b, d) - d_ab - cost(c, d) < -1e-9:
+                    if succ:
+                        self.move(a, b, c, d)
+                    else:
+                        self.move(b, a, d, c)
+                    return a, b, c, d
+        return None
+
+    def try_or_opt(self, s1):
+        """
+        Try moving the segment of 1 to 3 cities starting at s1 (possibly reversed) between two
+        neighbouring cities elsewhere in the tour, next to one of its ends' candidates.
+        """
+        cost = self.cost
+        for size in range(1, 4):
+            if self.n < size + 3:
+                break
+            se = self.tour[(self.pos[s1] + size - 1) % self.n]
+            p = self.prev(s1)
+            nx = self.next(se)
+            segment = set(self.tour[(self.pos[s1] + k) % self.n] for k in range(size))
+            removed = cost(p, s1) + cost(se, nx) - cost(p, nx)
+            for end in (s1, se):
+                for c0 in self.candidates[end]:
+                    if c0 in segment:
+                        continue
+                    for c, d in ((c0, self.next(c0)), (self.prev(c0), c0)):
+                        if c in segment or d in segment or d == p:
+                            continue
+                        d_cd = cost(c, d)
+                        forward = cost(c, s1) + cost(se, d) - d_cd
+                        backward = cost(c, se) + cost(s1, d) - d_cd
+                        if min(forward, backward) - removed < -1e-9:
+                            # A segment insertion is two (or three) 2-opt moves in a row
+                            self.move(p, s1, c, d)
+                            if c != nx:
+                                self.move(p, c, nx, se)
+                            if forward < backward:
+                                self.move(c, se, s1, d)
+                            return p, s1, se, nx, c, d
+        return None
+
+    def run(self, max_moves=None):
+        """
+        Apply improving moves until none is left (or max_moves have been made).
+
+        :return: The length of the improved tour.
+        """
+        # Every city starts with its don't-look bit clear, i.e. in the work queue
+        queue = deque(self.tour)
+        queued = bytearray([1]) * self.n
+        while queue and (max_moves is None or self.moves < max_moves):
+            a = queue.popleft()
+            queued[a] = 0
+            touched = self.try_2opt(a) or self.try_or_opt(a)
+            if touched:
+                # The cities at the ends of changed edges are worth looking at again
+                for city in touched:
+                    if not queued[city]:
+                        queued[city] = 1
+                        queue.append(city)
+                if not queued[a]:
+                    queued[a] = 1
+                    queue.appendleft(a)
+        return self.length()
+
+
+def one_tree(costs, n, pi):
+    """
+    Find the minimum 1-tree under node penalties pi: a minimum spanning tree over cities 1..n-1
+    (Prim's algorithm, O(n^2) on the dense matrix) plus the two cheapest edges from city 0, with
+    every edge (a, b) costing costs[a][b] + pi[a] + pi[b].
+
+    The cities outside the tree sit in a list; each step relaxes their keys and finds the
+    cheapest in the same pass, and the chosen city leaves the list by swapping in the last one.
+
+    :return: A tuple (penalised weight of the 1-tree, degree of every city in it).
+    """
+    degree = [0] * n
+    inf = math.inf
+    key = [inf] * n
+    parent = [-1] * n
+    remaining = list(range(2, n))
+    u = 1
+    weight = 0.0
+    while remaining:
+        row = u * n
+        pu = pi[u]
+        best = inf
+        best_index = 0
+        for i, v in enumerate(remaining):
+            w = costs[row + v] + pu + pi[v]
+            k = key[v]
+            if w < k:
+                key[v] = k = w
+                parent[v] = u
+            if k < best:
+                best = k
+                best_index = i
+        u = remaining[best_index]
+        remaining[best_index] = remaining[-1]
+        remaining.pop()
+        weight += best
+        degree[u] += 1
+        degree[parent[u]] += 1
+
+    # City 0 joins the tree through its two cheapest edges
+    p0 = pi[0]
+    first, second = heapq.nsmallest(2, ((costs[v] + p0 + pi[v], v) for v in range(1, n)))
+    weight += first[0] + second[0]
+    degree[0] = 2
+    degree[first[1]] += 1
+    degree[second[1]] += 1
+    return weight, degree
+
+
+def held_karp_bound(costs, n, upper_bound, iterations=held_karp_iterations, seconds=held_karp_seconds):
+    """
+    Lower-bound the optimal tour cost with the Held-Karp 1-tree relaxation: subgradient steps move
+    the penalties pi towards making every city's 1-tree degree 2, which tightens the bound. Every
+    iteration's 1-tree is a valid bound, so stopping after seconds only loosens it.
+
+    :param costs: The flat n x n cost matrix.
+    :param upper_bound: The cost of any known tour, used to size the subgradient steps.
+    :return: The best lower bound found, or None above held_karp_limit cities, where even a few
+        O(n^2) 1-trees cost more than the time an early stop could save.
+    """
+    if n < 3:
+        return upper_bound
+    if n > held_karp_limit:
+        return None
+    deadline = time.perf_counter() + seconds
+    pi = [0.0] * n
+    best = -math.inf
+    step_scale = 2.0
+    stale = 0
+    for _ in range(iterations):
+        weight, degree = one_tree(costs, n, pi)
+        bound = weight - 2 * sum(pi)
+        if bound > best + 1e-9:
+            best = bound
+            stale = 0
+        else:
+            stale += 1
+            if stale >= 5:
+                step_scale /= 2
+                stale = 0
+        subgradient = [d - 2 for d in degree]
+        norm = sum(g * g for g in subgradient)
+        # A 1-tree where every degree is 2 is a tour, so the bound is already optimal
+        if norm == 0 or best >= upper_bound - 1e-9 or time.perf_counter() > deadline:
+            break
+        step = step_scale * (upper_bound - bound) / norm
+        pi = [p + step * g for p, g in zip(pi, subgradient)]
+    return best
+
+
+def optimality_gap(cost, lower_bound):
+    """
+    Return how far a tour's cost can at most be above optimal, as a fraction of the lower bound.
+    """
+    if lower_bound <= 0:
+        # Only a zero-cost tour (e.g. a single city) is known to be optimal against a zero bound
+        return 0.0 if cost <= lower_bound else math.inf
+    return (cost - lower_bound) / lower_bound
+
+
+def solve_exact(costs, n, memory=exact_memory):
+    """
+    Solve TSP exactly with the Held-Karp bitmask dynamic program, O(n^2 2^n) time.
+
+    With city 0 fixed as the start, dp[S][j] is the cheapest path from city 0 through exactly the
+    cities in S ending at city j. The table is one flat float64 array (2^(n-1) subsets x (n-1) end
+    cities, unreachable entries infinite), and each entry is the min(map(add, ...)) over its
+    predecessor subset's row. Useful both
+    as a fast path for small instances and as an optimality oracle for the heuristic solvers.
+
+    :param costs: The flat n x n cost matrix.
+    :param memory: The most bytes the table may take.
+    :return: A tuple (optimal tour starting at city 0, its cost).
+    :raises ValueError: If the table would not fit in memory.
+    """
+    if n <= 2:
+        tour = list(range(n))
+        return tour, sum(costs[a * n + b] for a, b in zip(tour, tour[1:] + tour[:1])) if n > 1 else 0.0
+    m = n - 1
+    size = (1 << m) * m
+    if size * 8 > memory:
+        raise ValueError(f'{n} cities need a {size * 8 / 2 ** 20:.0f}MB table, over the '
+                         f'{memory / 2 ** 20:.0f}MB budget')
+
+    # col[j][k] is the cost of the step from city k + 1 to city j + 1
+    col = [[costs[(k + 1) * n + j + 1] for k in range(m)] for j in range(m)]
+    add = operator.add
+    dp = array('d', [math.inf]) * size
+    for j in range(m):
+        dp[(1 << j) * m + j] = costs[j + 1]
+    for subset in range(1, 1 << m):
+        if subset & (subset - 1) == 0:
+            continue
+        base = subset * m
+        bits = subset
+        while bits:
+            low = bits & -bits
+            j = low.bit_length() - 1
+            bits ^= low
+            prev = (subset ^ low) * m
+            dp[base + j] = min(map(add, dp[prev:prev + m], col[j]))
+
+    full = (1 << m) - 1
+    last = min(range(m), key=lambda j: dp[full * m + j] + costs[(j + 1) * n])
+    cost = dp[full * m + last] + costs[(last + 1) * n]
+
+    # Walk the table backwards, at each step finding the predecessor that produced the entry
+    tour = []
+    subset, j = full, last
+    while True:
+        tour.append(j + 1)
+        prev = subset ^ (1 << j)
+        if not prev:
+            break
+        row = dp[prev * m:(prev + 1) * m]
+        j = min(range(m), key=lambda k: row[k] + col[j][k])
+        subset = prev
+    tour.append(0)
+    tour.reverse()
+    return tour, cost
+
+
+# Map a visited flag (0 or 1) to whether the city is still open, for bytes.translate
+_unvisited = bytes([1, 0]) + bytes(254)
+
+
+class AntColony:
+    """
+    MAX-MIN Ant System over a dense cost matrix.
+
+    Pheromone and heuristic (1 / cost ** beta) values are flat n x n lists, and evaporation and
+    clamping to [tau_min, tau_max] are one pass over the whole matrix.
+    All ants build their tours in lockstep, one batched draw per step, choosing among the
+    unvisited cities of their candidate list.
+    After each iteration the iteration-best tour (or, periodically, the best so far) deposits
+    pheromone, optionally after being polished by 2-opt/Or-opt local search.
+    """
+    def __init__(self, costs, n, ants=num_ants, alpha=aco_alpha, beta=aco_beta, rho=aco_rho,
+                 candidates=None, local_search=True, seed=None):
+        """
+        :param costs: The flat n x n cost matrix (row a holds the costs from city a).
+        :param n: The number of cities.
+        :param candidates: For every city, nearby cities to choose from first; built from costs
+            when not given.
+        :param local_search: Improve every iteration-best tour with LocalSearch before deposit.
+        """
+        self.costs = costs
+        self.n = n
+        self.ants = ants
+        self.alpha = alpha
+        self.rho = rho
+        self.rng = random.Random(seed)
+        self.cost = lambda a, b: costs[a * n + b]
+        self.candidates = candidates or candidate_lists(n, self.cost)
+        self.local_search = local_search
+        self.eta = [1.0 / max(c, 1e-9) ** beta for c in costs]
+
+        # Start every trail at tau_max for a greedy tour, as MAX-MIN AS prescribes
+        tour = self.greedy_tour()
+        self.best_tour = tour
+        self.best_cost = self.tour_cost(tour)
+        self.set_limits()
+        self.tau = [self.tau_max] * (n * n)
+        self.iteration = -1
+
+    def greedy_tour(self):
+        tour = [0]
+        visited = bytearray(self.n)
+        visited[0] = 1
+        for _ in range(self.n - 1):
+            a = tour[-1]
+            b = min((c for c in range(self.n) if not visited[c]), key=lambda c: self.costs[a * self.n + c])
+            visited[b] = 1
+            tour.append(b)
+        return tour
+
+    def tour_cost(self, tour):
+        costs, n = self.costs, self.n
+        return sum(costs[a * n + b] for a, b in zip(tour, tour[1:])) + costs[tour[-1] * n + tour[0]]
+
+    def set_limits(self):
+        self.tau_max = 1.0 / (self.rho * self.best_cost) if self.best_cost else 1.0
+        self.tau_min = self.tau_max / (2 * self.n)
+
+    def construct(self):
+        """
+        Build one tour per ant, all ants advancing one city per step.
+
+        The choice weights (tau ** alpha * eta) are only needed over each city's candidate list,
+        so they are built once per iteration as per-row cumulative sums. Every step then draws
+        the next city for all ants at once: one uniform per ant, scaled to its row's total and
+        bisected into the row. An ant whose draw lands on a visited city chooses again among its
+        unvisited candidates only, which keeps every choice proportional to its weight among the
+        unvisited candidates.
+        """
+        n, rng, candidates = self.n, self.rng, self.candidates
+        tau, eta = self.tau, self.eta
+        weights = []
+        for a, near in enumerate(candidates):
+            row = a * n
+            cells = [row + c for c in near]
+            pheromone = map(tau.__getitem__, cells)
+            if self.alpha != 1.0:
+                pheromone = map(pow, pheromone, repeat(self.alpha))
+            weights.append(list(map(operator.mul, pheromone, map(eta.__getitem__, cells))))
+        cumulative = [list(accumulate(row)) for row in weights]
+        totals = [row[-1] if row else 0.0 for row in cumulative]
+
+        current = [rng.randrange(n) for _ in range(self.ants)]
+        steps = [current]
+        full_rows = {}
+        visited = []
+        for a in current:
+            seen = bytearray(n)
+            seen[a] = 1
+            visited.append(seen)
+        draws = iter(rng.random, -1.0)
+        for _ in range(n - 1):
+            targets = map(operator.mul, map(totals.__getitem__, current), draws)
+            slots = map(bisect_left, map(cumulative.__getitem__, current), targets)
+            picks = list(map(operator.getitem, map(candidates.__getitem__, current), slots))
+            for i in compress(range(self.ants), map(operator.getitem, visited, picks)):
+                seen, a = visited[i], current[i]
+                unseen = seen.translate(_unvisited)
+                near = candidates[a]
+                mask = list(map(unseen.__getitem__, near))
+                if any(mask):
+                    options = list(accumulate(compress(weights[a], mask)))
+                    picks[i] = list(compress(near, mask))[bisect_left(options, next(draws) * options[-1])]
+                else:
+                    # Every candidate is taken: go to the best remaining city instead, weighing
+                    #   the whole row only for the cities where that happens
+                    if a not in full_rows:
+                        row = slice(a * n, (a + 1) * n)
+                        full_rows[a] = list(map(operator.mul, map(pow, tau[row], repeat(self.alpha)), eta[row]))
+                    picks[i] = max(compress(range(n), unseen), key=full_rows[a].__getitem__)
+            for seen, b in zip(visited, picks):
+                seen[b] = 1
+            steps.append(picks)
+            current = picks
+        return [list(tour) for tour in zip(*steps)]
+
+    def step(self):
+        """
+        Run one iteration: construct, (polish,) evaporate and deposit.
+
+        :return: A dict of statistics for the iteration.
+        """
+        self.iteration += 1
+        tours = self.construct()
+        costs = [self.tour_cost(tour) for tour in tours]
+        best = min(range(len(tours)), key=costs.__getitem__)
+        tour, cost = tours[best], costs[best]
+        if self.local_search:
+            search = LocalSearch(self.cost, self.candidates, tour)
+            cost = search.run()
+            tour = list(search.tour)
+        if cost < self.best_cost:
+            self.best_tour, self.best_cost = tour, cost
+            self.set_limits()
+
+        # The best-so-far tour reinforces its trail every few iterations, the iteration best otherwise
+        if self.iteration % 5 == 4:
+            tour, cost = self.best_tour, self.best_cost
+        n = self.n
+        tau = list(map(max, map(operator.mul, self.tau, repeat(1.0 - self.rho)), repeat(self.tau_min)))
+        deposit = 1.0 / cost if cost else self.tau_max
+        for a, b in zip(tour, tour[1:] + tour[:1]):
+            tau[a * n + b] = tau[b * n + a] = min(tau[a * n + b] + deposit, self.tau_max)
+        self.tau = tau
+        return {'iteration': self.iteration, 'best_cost': self.best_cost, 'iteration_cost': costs[best]}
+
+    def run(self, iterations=num_iterations, callback=None, stop=None, lower_bound=None, gap=target_gap):
+        """
+        Run up to iterations iterations.
+
+        :param callback: Optional function called with each iteration's statistics.
+        :param stop: Optional threading.Event that ends the run early when set.
+        :param lower_bound: Optional lower bound on the optimal cost (see held_karp_bound); the run
+            ends as soon as the best tour is within gap of it.
+        :return: The list of per-iteration statistics, each with the running iterations/second
+            and, given a lower bound, the optimality gap.
+        """
+        history = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if stop is not None and stop.is_set():
+                break
+            stats = self.step()
+            elapsed = time.perf_counter() - start
+            stats['iterations_per_second'] = (self.iteration + 1) / elapsed if elapsed else None
+            if lower_bound is not None:
+                stats['gap'] = optimality_gap(self.best_cost, lower_bound)
+            history.append(stats)
+            if callback is not None:
+                callback(stats)
+            if lower_bound is not None and stats['gap'] <= gap:
+                break
+        return history
+
+
+def improve_tour(graph, tour=None, rng=random):
+    """
+    Run 2-opt/Or-opt local search over the road network's metric closure (the cost of driving
+    between two cities along the roads), starting from tour or from a nearest-neighbour tour.
+
+    :return: A tuple (tour as a list of cities, its cost).
+    """
+    paths = graph.shortest_paths()
+    if tour is None:
+        tour = SpatialGrid(graph.xs, graph.ys).nearest_neighbor_tour(rng.randrange(graph.n))
+    search = LocalSearch(paths.cost, candidate_lists(graph.n, paths.cost), tour)
+    cost = search.run()
+    return list(search.tour), cost
+
+
+def euclidean_tour(graph, rng=random):
+    """
+    Build a straight-line tour for instances too large for a metric closure: a nearest-neighbour
+    tour and candidate lists from a SpatialGrid, improved by 2-opt/Or-opt local search.
+
+    :return: A tuple (tour as a list of cities, its length).
+    """
+    tour = SpatialGrid(graph.xs, graph.ys).nearest_neighbor_tour(rng.randrange(graph.n))
+    search = LocalSearch(graph.distance, SpatialGrid(graph.xs, graph.ys).candidate_lists(), tour)
+    length = search.run()
+    return list(search.tour), length
+
+
+def generate_local_roads(xs, ys, count, rng=random):
+    """
+    Pick count distinct roads that connect each city to cities near it rather than anywhere on the
+    map. A nearest-neighbour path through all cities keeps the network connected, and the rest of
+    the roads join random cities to one of their nearest neighbours.
+
+    :return: A list of (a, b) city index pairs with a < b.
+    """
+    n = len(xs)
+    if n > 1 and not n - 1 <= count <= n * (n - 1) // 2:
+        raise ValueError(f'{count} roads cannot connect {n} cities (need {n - 1} to {n * (n - 1) // 2})')
+    grid = SpatialGrid(xs, ys)
+    k = min(n - 1, max(4, 2 * math.ceil(2 * count / max(n, 1))))
+    near = grid.candidate_lists(k)
+    path = grid.nearest_neighbor_tour()
+    taken = {a * n + b if a < b else b * n + a for a, b in zip(path, path[1:])}
+    attempts = 0
+    while len(taken) < count:
+        a = rng.randrange(n)
+        b = rng.choice(near[a]) if attempts < 20 * count else rng.randrange(n)
+        attempts += 1
+        if a != b:
+            taken.add(a * n + b if a < b else b * n + a)
+    return [divmod(key, n) for key in taken]
+
+
+def generate_roads(n, count, rng=random):
+    """
+    Pick count distinct roads between n cities such that every city can reach every other.
+
+    A random spanning tree goes in first (the cities in shuffled order, each joined to a random
+    earlier one). The remaining roads are sampled without replacement, with every road keyed as
+    the integer a * n + b (a < b) in a set, so checking for duplicates is O(1). When more than
+    half of all possible roads are wanted, the roads to leave out are sampled instead, so the
+    rejection loop never runs on a nearly full set.
+
+    :return: A list of (a, b) city index pairs with a < b.
+    :raises ValueError: If count roads cannot connect n cities or do not fit between them.
+    """
+    total = n * (n - 1) // 2
+    if n > 1 and not n - 1 <= count <= total:
+        raise ValueError(f'{count} roads cannot connect {n} cities (need {n - 1} to {total})')
+
+    order = list(range(n))
+    rng.shuffle(order)
+    taken = set()
+    for i in range(1, n):
+        a, b = order[i], order[rng.randrange(i)]
+        taken.add(a * n + b if a < b else b * n + a)
+
+    def sample_keys(keys, size):
+        while len(keys) < size:
+            a = rng.randrange(n)
+            b = rng.randrange(n)
+            if a != b:
+                keys.add(a * n + b if a < b else b * n + a)
+
+    if count - len(taken) <= (total - len(taken)) // 2:
+        sample_keys(taken, count)
+        keys = taken
+    else:
+        # Sample the roads to leave out among those not in the tree, then take everything else
+        excluded = set(taken)
+        sample_keys(excluded, len(taken) + total - count)
+        excluded -= taken
+        keys = (a * n + b for a in range(n) for b in range(a + 1, n) if a * n + b not in excluded)
+    return [divmod(key, n) for key in keys]
+
+
+def random_graph(cities=num_cities, roads=num_roads, x0=0, y0=0, x1=1000, y1=1000, rng=random, local=False):
+    """
+    Generate a connected road network of cities placed uniformly at random in [x0, x1] x [y0, y1].
+
+    :param local: Connect cities to nearby cities (generate_local_roads) instead of at random.
+    """
+    xs = [rng.randint(x0, x1) for _ in range(cities)]
+    ys = [rng.randint(y0, y1) for _ in range(cities)]
+    if local:
+        return Graph(xs, ys, generate_local_roads(xs, ys, roads, rng))
+    return Graph(xs, ys, generate_roads(cities, roads, rng))
+
+
+def _nint(x):
+    return int(x + 0.5)
+
+
+def _geo_radians(x):
+    # TSPLIB GEO coordinates are DDD.MM (degrees and minutes), converted with TSPLIB's own PI
+    degrees = int(x)
+    return 3.141592 * (degrees + 5.0 * (x - degrees) / 3.0) / 180.0
+
+
+def euc_2d(xa, ya, xb, yb):
+    return _nint(math.hypot(xa - xb, ya - yb))
+
+
+def ceil_2d(xa, ya, xb, yb):
+    return math.ceil(math.hypot(xa - xb, ya - yb))
+
+
+def att(xa, ya, xb, yb):
+    r = math.sqrt(((xa - xb) ** 2 + (ya - yb) ** 2) / 10.0)
+    t = _nint(r)
+    return t + 1 if t < r else t
+
+
+def geo(xa, ya, xb, yb):
+    lat_a, lon_a, lat_b, lon_b = map(_geo_radians, (xa, ya, xb, yb))
+    q1 = math.cos(lon_a - lon_b)
+    q2 = math.cos(lat_a - lat_b)
+    q3 = math.cos(lat_a + lat_b)
+    return int(tsplib_earth_radius * math.acos(min(1.0, 0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3))) + 1.0)
+
+
+# The TSPLIB EDGE_WEIGHT_TYPEs computed from coordinates, and their codes in the binary format
+#   (0 is EXPLICIT)
+tsplib_distances = {'EUC_2D': euc_2d, 'CEIL_2D': ceil_2d, 'ATT': att, 'GEO': geo}
+tsplib_weight_codes = {'EXPLICIT': 0, 'EUC_2D': 1, 'CEIL_2D': 2, 'ATT': 3, 'GEO': 4}
+
+
+class Instance:
+    """
+    A TSPLIB problem: a complete graph over n cities whose edge weights come either from the city
+    coordinates under one of the TSPLIB distance functions or from an explicit matrix.
+
+    Coordinates and the matrix may be arrays or memoryviews over a memory-mapped binary file (see
+    open_binary), and everything here only indexes them, so a mapped instance is never copied.
+    """
+    def __init__(self, name, n, weight_type='EUC_2D', xs=None, ys=None, matrix=None, comment=''):
+        """
+        :param weight_type: A key of tsplib_distances, or 'EXPLICIT' when matrix holds the weights.
+        :param xs: The x coordinate of each city (for EXPLICIT instances, optional display coordinates).
+        :param ys: The y coordinate of each city.
+        :param matrix: The flat n x n weight matrix (row a holds the weights from city a), if any.
+        """
+        if weight_type not in tsplib_weight_codes:
+            raise ValueError(f'Unsupported EDGE_WEIGHT_TYPE {weight_type}')
+        if matrix is None and (weight_type == 'EXPLICIT' or xs is None):
+            raise ValueError('An instance needs either coordinates or an explicit weight matrix')
+        self.name = name
+        self.comment = comment
+        self.n = n
+        self.weight_type = weight_type
+        self.xs = xs
+        self.ys = ys
+        self.matrix = matrix
+        # Set by open_binary, so that pickling (e.g. into a process pool) reopens the mapping
+        self.path = None
+        if matrix is not None:
+            self.cost = lambda a, b: matrix[a * n + b]
+        else:
+            distance = tsplib_distances[weight_type]
+            self.cost = lambda a, b: distance(xs[a], ys[a], xs[b], ys[b])
+
+    def __reduce__(self):
+        if self.path is not None:
+            return open_binary, (self.path,)
+        return Instance, (self.name, self.n, self.weight_type, self.xs, self.ys, self.matrix, self.comment)
+
+    @classmethod
+    def from_graph(cls, graph, name='roads'):
+        """
+        Turn a road network into an EXPLICIT instance whose weights are its shortest-path costs,
+        keeping the city positions as display coordinates.
+        """
+        return cls(name, graph.n, 'EXPLICIT', graph.xs, graph.ys, graph.shortest_paths().dist,
+                   comment=f'{graph.n} cities, {len(graph.roads)} roads')
+
+    def costs(self):
+        """
+        Return the flat n x n weight matrix, computing it from the coordinates if the instance has
+        none. Rows of EUC_2D and CEIL_2D weights are built as in distance_matrix.
+        """
+        if self.matrix is not None:
+            return self.matrix
+        n = self.n
+        xs, ys = self.xs, self.ys
+        matrix = array('d')
+        for a in range(n):
+            xa, ya = xs[a], ys[a]
+            if self.weight_type in ('EUC_2D', 'CEIL_2D'):
+                row = map(math.hypot, map(operator.sub, xs, repeat(xa, n)), map(operator.sub, ys, repeat(ya, n)))
+                if self.weight_type == 'EUC_2D':
+                    matrix.extend(map(math.floor, map(operator.add, row, repeat(0.5, n))))
+                else:
+                    matrix.extend(map(math.ceil, row))
+            else:
+                matrix.extend(map(self.cost, repeat(a, n), range(n)))
+        self.matrix = matrix
+        self.cost = lambda a, b: matrix[a * n + b]
+        return matrix
+
+    def tour_length(self, tour):
+        cost = self.cost
+        return sum(map(cost, tour, tour[1:])) + cost(tour[-1], tour[0])
+
+
+def _parse_tsplib(path):
+    """
+    Split a TSPLIB file into its "KEY : value" specification entries and the numeric tokens of
+    each data section.
+    """
+    spec = {}
+    sections = {}
+    current = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line[0].isalpha():
+                key, _, value = line.partition(':')
+                key = key.strip().upper()
+                if key == 'EOF':
+                    break
+                if key.endswith('_SECTION'):
+                    current = sections.setdefault(key, [])
+                    current.extend(value.split())
+                else:
+                    spec[key] = value.strip()
+                    current = None
+            elif current is not None:
+                current.extend(line.split())
+    return spec, sections
+
+
+def _full_matrix(weights, n, layout):
+    """
+    Expand the weights of an EDGE_WEIGHT_SECTION in any TSPLIB EDGE_WEIGHT_FORMAT into a flat
+    n x n matrix. The column-wise triangular formats of a symmetric matrix are the row-wise
+    formats of the other triangle.
+    """
+    layout = {'UPPER_COL': 'LOWER_ROW', 'LOWER_COL': 'UPPER_ROW',
+              'UPPER_DIAG_COL': 'LOWER_DIAG_ROW', 'LOWER_DIAG_COL': 'UPPER_DIAG_ROW'}.get(layout, layout)
+    counts = {'FULL_MATRIX': n * n, 'UPPER_ROW': n * (n - 1) // 2, 'LOWER_ROW': n * (n - 1) // 2,
+              'UPPER_DIAG_ROW': n * (n + 1) // 2, 'LOWER_DIAG_ROW': n * (n + 1) // 2}
+    if layout not in counts:
+        raise ValueError(f'Unsupported EDGE_WEIGHT_FORMAT {layout}')
+    if len(weights) < counts[layout]:
+        raise ValueError(f'A {layout} over {n} cities needs {counts[layout]} weights, not {len(weights)}')
+    if layout == 'FULL_MATRIX':
+        return array('d', weights[:n * n])
+    if layout == 'UPPER_ROW':
+        pairs = ((a, b) for a in range(n) for b in range(a + 1, n))
+    elif layout == 'LOWER_ROW':
+        pairs = ((a, b) for a in range(n) for b in range(a))
+    elif layout == 'UPPER_DIAG_ROW':
+        pairs = ((a, b) for a in range(n) for b in range(a, n))
+    else:
+        pairs = ((a, b) for a in range(n) for b in range(a + 1))
+    matrix = array('d', bytes(8 * n * n))
+    for (a, b), w in zip(pairs, weights):
+        matrix[a * n + b] = w
+        matrix[b * n + a] = w
+    return matrix
+
+
+def read_tsp(path):
+    """
+    Read a symmetric TSPLIB .tsp file with EUC_2D, CEIL_2D, ATT, GEO or EXPLICIT edge weights.
+
+    Asymmetric instances (TYPE: ATSP, or an explicit matrix that differs from its transpose) are
+    rejected: the Held-Karp bound and the 2-opt moves of LocalSearch assume cost(a, b) ==
+    cost(b, a), and on asymmetric costs they give invalid bounds and tour lengths.
+
+    :return: An Instance.
+    :raises ValueError: For asymmetric or malformed instances (no DIMENSION, too few coordinates
+        or weights), or edge weight types or formats this module cannot evaluate.
+    """
+    spec, sections = _parse_tsplib(path)
+    if spec.get('TYPE', 'TSP').split()[0].upper() != 'TSP':
+        raise ValueError(f'{path}: only symmetric TSP instances are supported, not TYPE {spec["TYPE"]}')
+    if not spec.get('DIMENSION', '').isdigit():
+        raise ValueError(f'{path}: DIMENSION is missing or not a whole number')
+    n = int(spec['DIMENSION'])
+    weight_type = spec.get('EDGE_WEIGHT_TYPE', 'EXPLICIT').upper()
+    xs = ys = matrix = None
+    coords = sections.get('NODE_COORD_SECTION') or sections.get('DISPLAY_DATA_SECTION')
+    if coords:
+        # Lines are "index x y"; the index is implied by the order
+        xs = array('d', map(float, coords[1::3]))
+        ys = array('d', map(float, coords[2::3]))
+        if len(ys) < n:
+            raise ValueError(f'{path}: {n} cities but coordinates for only {len(ys)}')
+    if weight_type == 'EXPLICIT':
+        weights = list(map(float, sections.get('EDGE_WEIGHT_SECTION', ())))
+        try:
+            matrix = _full_matrix(weights, n, spec.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper())
+        except ValueError as e:
+            raise ValueError(f'{path}: {e}') from None
+        # Row a against column a, one array comparison per city
+        if any(matrix[a * n:(a + 1) * n] != matrix[a::n] for a in range(n)):
+            raise ValueError(f'{path}: the EDGE_WEIGHT_SECTION is not symmetric')
+    return Instance(spec.get('NAME', path), n, weight_type, xs, ys, matrix, spec.get('COMMENT', ''))
+
+
+def _format_number(x):
+    return str(int(x)) if x == int(x) else repr(float(x))
+
+
+def write_tsp(instance, path):
+    """
+    Write an Instance as a TSPLIB .tsp file; explicit weights are written as a FULL_MATRIX, with
+    any coordinates as display data.
+    """
+    n = instance.n
+    with open(path, 'w') as f:
+        f.write(f'NAME : {instance.name}\n')
+        if instance.comment:
+            f.write(f'COMMENT : {instance.comment}\n')
+        f.write(f'TYPE : TSP\nDIMENSION : {n}\nEDGE_WEIGHT_TYPE : {instance.weight_type}\n')
+        if instance.weight_type == 'EXPLICIT':
+            f.write('EDGE_WEIGHT_FORMAT : FULL_MATRIX\n')
+            if instance.xs is not None:
+                f.write('DISPLAY_DATA_TYPE : TWOD_DISPLAY\n')
+            f.write('EDGE_WEIGHT_SECTION\n')
+            matrix = instance.matrix
+            for a in range(n):
+                f.write(' '.join(map(_format_number, matrix[a * n:(a + 1) * n])))
+                f.write('\n')
+        if instance.xs is not None:
+            f.write('DISPLAY_DATA_SECTION\n' if instance.weight_type == 'EXPLICIT' else 'NODE_COORD_SECTION\n')
+            for i, (x, y) in enumerate(zip(instance.xs, instance.ys)):
+                f.write(f'{i + 1} {_format_number(x)} {_format_number(y)}\n')
+        f.write('EOF\n')
+
+
+def read_tour(path):
+    """
+    Read the first tour of a TSPLIB .tour file.
+
+    :return: The tour as a list of 0-based city indices.
+    """
+    spec, sections = _parse_tsplib(path)
+    tour = []
+    for token in sections.get('TOUR_SECTION', ()):
+        city = int(token)
+        if city == -1:
+            break
+        tour.append(city - 1)
+    return tour
+
+
+def write_tour(tour, path, name='tour', comment=''):
+    """
+    Write a tour of 0-based city indices as a TSPLIB .tour file.
+    """
+    with open(path, 'w') as f:
+        f.write(f'NAME : {name}\n')
+        if comment:
+            f.write(f'COMMENT : {comment}\n')
+        f.write(f'TYPE : TOUR\nDIMENSION : {len(tour)}\nTOUR_SECTION\n')
+        f.writelines(f'{city + 1}\n' for city in tour)
+        f.write('-1\nEOF\n')
+
+
+def write_binary(instance, path, matrix=None):
+    """
+    Write an Instance in the compact binary format read by open_binary: a fixed header, then the
+    x and y coordinates as float64 arrays, then optionally the flat n x n float64 weight matrix.
+
+    :param matrix: Store the weight matrix; by default only when the weights are explicit.
+    """
+    n = instance.n
+    if matrix is None:
+        matrix = instance.weight_type == 'EXPLICIT'
+    flags = (binary_coords if instance.xs is not None else 0) | (binary_matrix if matrix else 0)
+    with open(path, 'wb') as f:
+        f.write(binary_header.pack(binary_magic, binary_version, tsplib_weight_codes[instance.weight_type], flags,
+                                   n, instance.name.encode()[:64]))
+        for values in ((instance.xs, instance.ys) if flags & binary_coords else ()):
+            _little_endian(array('d', values)).tofile(f)
+        if matrix:
+            costs = instance.costs()
+            # Row by row, so a matrix never needs a second full-size copy
+            for a in range(n):
+                _little_endian(array('d', costs[a * n:(a + 1) * n])).tofile(f)
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def open_binary(path):
+    """
+    Open an instance written by write_binary without reading it: coordinates and matrix are
+    memoryviews over a read-only memory map, so pages load on first touch and every process
+    mapping the same file shares them through the OS page cache.
+
+    :return: An Instance backed by the mapping.
+    :raises ValueError: If the file is not in the binary instance format or is truncated.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < binary_header.size:
+        raise ValueError(f'{path} is not a binary TSP instance')
+    magic, version, code, flags, n, name = binary_header.unpack_from(data)
+    if magic != binary_magic or version != binary_version:
+        raise ValueError(f'{path} is not a binary TSP instance')
+    weight_types = [key for key, value in tsplib_weight_codes.items() if value == code]
+    if not weight_types:
+        raise ValueError(f'{path}: unknown edge weight code {code}')
+    weight_type = weight_types[0]
+    view = memoryview(data)[binary_header.size:]
+    expected = 8 * ((2 * n if flags & binary_coords else 0) + (n * n if flags & binary_matrix else 0))
+    if len(view) < expected or len(view) % 8:
+        raise ValueError(f'{path}: expected {expected} bytes of coordinates and weights, found {len(view)}')
+    if sys.byteorder == 'little':
+        values = view.cast('d')
+    else:
+        # Big-endian machines pay for one byte-swapped copy
+        values = _little_endian(array('d', view.tobytes()))
+    xs = ys = matrix = None
+    if flags & binary_coords:
+        xs, ys = values[:n], values[n:2 * n]
+        values = values[2 * n:]
+    if flags & binary_matrix:
+        matrix = values[:n * n]
+    instance = Instance(name.rstrip(b'\0').decode(), n, weight_type, xs, ys, matrix)
+    instance.path = path
+    return instance
+
+
+def instance_tour(instance, rng=random):
+    """
+    Run 2-opt/Or-opt local search over an Instance, starting from a nearest-neighbour tour with
+    SpatialGrid candidates when its weights come from coordinates, else from a random tour with
+    brute-force candidate lists.
+
+    :return: A tuple (tour as a list of cities, its cost).
+    """
+    if instance.weight_type == 'EXPLICIT':
+        tour = list(range(instance.n))
+        rng.shuffle(tour)
+        candidates = candidate_lists(instance.n, instance.cost)
+    else:
+        grid = SpatialGrid(instance.xs, instance.ys)
+        candidates = grid.candidate_lists()
+        tour = SpatialGrid(instance.xs, instance.ys).nearest_neighbor_tour(rng.randrange(instance.n))
+    search = LocalSearch(instance.cost, candidates, tour)
+    cost = search.run()
+    return list(search.tour), cost
+
+
+def load_instance(path):
+    """
+    Load an instance from a binary instance file or a TSPLIB .tsp file, by its contents.
+    """
+    with open(path, 'rb') as f:
+        binary = f.read(len(binary_magic)) == binary_magic
+    return open_binary(path) if binary else read_tsp(path)
+
+
+def save_instance(instance, path):
+    """
+    Save an instance as a TSPLIB file, or in the binary format when path ends in binary_suffix.
+    """
+    if path.endswith(binary_suffix):
+        write_binary(instance, path)
+    else:
+        write_tsp(instance, path)
 
 
 class UI(tk.Tk):
@@ -56,55 +1442,57 @@ class UI(tk.Tk):
         h = height-padding*2
 
         cities_list = []
-        roads_list = []
         edge_list = []
-
-        def add_city():
-            x = random.randint(padding, w)
-            y = random.randint(padding, h)
-
-            node = Node(x, y)
-            cities_list.append(node)
-
-        def add_road():
-            a = random.randint(0, len(cities_list)-1)
-            b = random.randint(0, len(cities_list)-1)
-
-            road = f'{min(a, b)},{max(a, b)}'
-            while a == b or road in roads_list:
-                a = random.randint(0, len(cities_list)-1)
-                b = random.randint(0, len(cities_list)-1)
-                road = f'{min(a, b)},{max(a, b)}'
-
-            edge = Edge(cities_list[a], cities_list[b])
-            roads_list.append(road)
-            edge_list.append(edge)
+        self.graph = None
+        self.stop_colony = threading.Event()
 
         def generate_city():
-            for c in range(num_cities):
-                add_city()
-            for r in range(num_roads):
-                add_road()
+            # A tour from the previous network would index the wrong roads
+            self.stop_colony.set()
+            self.graph = random_graph(num_cities, num_roads, padding, padding, w, h)
+            cities_list[:] = [Node(x, y) for x, y in zip(self.graph.xs, self.graph.ys)]
+            # Lengths come out of the graph rather than one sqrt per Edge
+            edge_list[:] = [Edge(cities_list[a], cities_list[b], self.graph.road_length(r))
+                            for r, (a, b) in enumerate(self.graph.roads)]
+
+        # The roads currently drawn as part of the tour
+        shown_roads = set()
+        status_text = []
 
         def draw_city():
-            #clear_canvas()
+            # Every road and city becomes one canvas item, created here and only recolored later
+            self.canvas.delete("all")
+            shown_roads.clear()
+            status_text.clear()
             for e in edge_list:
                 e.draw(self.canvas)
             for n in cities_list:
                 n.draw(self.canvas)
 
+        def draw_status(text):
+            # The status label is created once and then only has its text replaced
+            if not status_text:
+                status_text.append(self.canvas.create_text(padding, padding / 2, anchor='w', text='',
+                                                           font=('Arial', 18)))
+            self.canvas.itemconfig(status_text[0], text=text)
+            self.canvas.tag_raise(status_text[0])
+
         def draw_genome(genome):
-            #clear_canvas()
-            for e in range(num_roads):
-                edge = edge_list[e]
-                color = 'grey'
-                style = (2, 4)
-                if genome[e]:
-                    color = 'red'
-                    style = (1, 0)
-                edge.draw(self.canvas, color, style)
-            for n in cities_list:
-                n.draw(self.canvas, 'red')
+            """
+            Show the tour given as the set of road indices it drives, recoloring only the roads that
+            entered or left the tour since the last frame.
+            """
+            if not shown_roads:
+                for n in cities_list:
+                    n.recolor(self.canvas, 'red')
+            for r in genome - shown_roads:
+                edge_list[r].recolor(self.canvas, 'red', (1, 0))
+            for r in shown_roads - genome:
+                edge_list[r].recolor(self.canvas)
+            shown_roads.clear()
+            shown_roads.update(genome)
+            # Keep the cities on top of the recolored roads
+            self.canvas.tag_raise('city')
 
         # We create a standard banner menu bar and attach it to the window
         menu_bar = Menu(self)
@@ -125,10 +1513,213 @@ class UI(tk.Tk):
         #   not actually calling the function as part of the add_command
         menu_TS.add_command(label="Generate", command=generate, underline=0)
 
+        snapshots = queue.Queue(maxsize=8)
+
+        def publish(snapshot):
+            # Drop the oldest snapshot rather than ever block the solver thread
+            while True:
+                try:
+                    snapshots.put_nowait(snapshot)
+                    return
+                except queue.Full:
+                    try:
+                        snapshots.get_nowait()
+                    except queue.Empty:
+                        pass
+
+        def run_colony(colony, stop):
+            # The bound lets the colony stop as soon as its tour is provably good enough
+            bound = held_karp_bound(colony.costs, colony.n, colony.best_cost)
+            colony.run(callback=lambda stats: publish((stop, list(colony.best_tour), stats)), stop=stop,
+                       lower_bound=bound)
+            publish((stop, None, None))
+
+        def poll_colony(stop):
+            # Polling at max_fps and drawing only the latest snapshot rate-limits the display
+            latest = None
+            finished = False
+            while True:
+                try:
+                    run, tour, stats = snapshots.get_nowait()
+                except queue.Empty:
+                    break
+                if run is not stop:
+                    continue
+                if tour is None:
+                    finished = True
+                else:
+                    latest = tour, stats
+            if stop.is_set():
+                return
+            if latest is not None:
+                tour, stats = latest
+                print(f'Iteration {stats["iteration"]}: best {stats["best_cost"]:.1f} '
+                      f'({stats["iterations_per_second"]:.1f} iterations/s)')
+                draw_genome(set(self.graph.shortest_paths().expand_tour(tour)))
+                draw_status(f'Tour {stats["best_cost"]:.1f}   gap to lower bound {stats["gap"]:.2%}')
+            if not finished:
+                self.after(int(1000 / max_fps), poll_colony, stop)
+
+        def ant_colony():
+            if self.graph is None:
+                return
+            # Stop any colony that is still running before starting a new one
+            self.stop_colony.set()
+            self.stop_colony = threading.Event()
+            paths = self.graph.shortest_paths()
+            colony = AntColony(paths.dist, self.graph.n)
+            threading.Thread(target=run_colony, args=(colony, self.stop_colony), daemon=True).start()
+            poll_colony(self.stop_colony)
+        menu_TS.add_command(label="Ant Colony", command=ant_colony, underline=0)
+
+        def run_exact(stop):
+            try:
+                tour, cost = solve_exact(self.graph.shortest_paths().dist, self.graph.n)
+            except ValueError as e:
+                # Too many cities for the dynamic program, so let the colony search instead
+                print(f'{e}; falling back to the ant colony')
+                run_colony(AntColony(self.graph.shortest_paths().dist, self.graph.n), stop)
+                return
+            publish((stop, tour, {'iteration': 'exact', 'best_cost': cost, 'iterations_per_second': 0.0, 'gap': 0.0}))
+            publish((stop, None, None))
+
+        def exact():
+            if self.graph is None:
+                return
+            self.stop_colony.set()
+            self.stop_colony = threading.Event()
+            threading.Thread(target=run_exact, args=(self.stop_colony,), daemon=True).start()
+            poll_colony(self.stop_colony)
+        menu_TS.add_command(label="Exact", command=exact, underline=0)
+
         # We have to call self.mainloop() in our constructor (__init__) to start the UI loop and display the window
         self.mainloop()
 
 
+def positive_int(text):
+    """
+    argparse type for counts that must be at least 1.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{text} is not a positive integer')
+    return value
+
+
+def main(argv=None):
+    """
+    Headless mode: generate a road network (or load a TSPLIB instance) and solve it with no Tk window.
+    """
+    parser = argparse.ArgumentParser(description='Solve a Traveling Salesman instance without the UI.')
+    parser.add_argument('--cities', type=positive_int, default=num_cities,
+                        help=f'number of cities (above {dense_limit}, tours follow straight lines instead of the roads)')
+    parser.add_argument('--roads', type=int, default=num_roads, help='number of roads')
+    parser.add_argument('--local-roads', action='store_true', help='connect cities to nearby cities only')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--solver', choices=('aco', 'local', 'exact'), default='aco',
+                        help='ant colony (aco), 2-opt/Or-opt local search (local) or Held-Karp dynamic '
+                             f'programming (exact, small instances only); above {dense_limit} cities every '
+                             f'solver runs as local')
+    parser.add_argument('--iterations', type=positive_int, default=num_iterations, help='ant colony iterations')
+    parser.add_argument('--ants', type=positive_int, default=num_ants, help='ants per iteration')
+    parser.add_argument('--gap', type=float, default=target_gap,
+                        help='stop the ant colony once the tour is within this fraction of the lower bound')
+    parser.add_argument('--instance', default=None,
+                        help='solve this TSPLIB .tsp or binary instance file instead of a generated network')
+    parser.add_argument('--save-instance', default=None,
+                        help=f'save the instance as a TSPLIB .tsp file, or in the binary format if the name '
+                             f'ends in {binary_suffix}')
+    parser.add_argument('--tour', default=None, help='write the best tour to this TSPLIB .tour file')
+    parser.add_argument('--output', default='-', help='JSON output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.instance:
+        try:
+            instance = load_instance(args.instance)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        graph = paths = None
+    else:
+        try:
+            graph = random_graph(args.cities, args.roads, rng=rng, local=args.local_roads)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.cities <= dense_limit:
+            paths = graph.shortest_paths()
+            instance = Instance.from_graph(graph)
+        else:
+            # Too many cities for the n x n metric closure, so tour them along straight lines
+            paths = None
+            instance = Instance('roads', graph.n, 'EUC_2D', graph.xs, graph.ys,
+                                comment=f'{graph.n} cities, straight-line distances')
+    if args.save_instance:
+        save_instance(instance, args.save_instance)
+    n = instance.n
+    start = time.perf_counter()
+    result = {'instance': instance.name, 'cities': n, 'solver': args.solver}
+    if graph is not None:
+        result['roads'] = len(graph.roads)
+    # The Held-Karp bound needs the dense matrix, so very large instances go without one
+    bound = None
+    solver = args.solver
+    if solver != 'local' and n > dense_limit:
+        # The ant colony and the dynamic program both need the dense n x n cost matrix
+        reason = f'{n} cities are over the {dense_limit}-city limit for a dense cost matrix'
+        print(f'{solver}: {reason}; falling back to local', file=sys.stderr)
+        solver = 'local'
+        result.update(solver=solver, fallback=reason)
+    if solver == 'exact':
+        try:
+            tour, cost = solve_exact(instance.costs(), n)
+            bound = cost
+        except ValueError as e:
+            # Too many cities for the dynamic program, so settle for a heuristic tour
+            solver = 'aco'
+            print(f'exact: {e}; falling back to {solver}', file=sys.stderr)
+            result.update(solver=solver, fallback=str(e))
+    if solver == 'aco':
+        colony = AntColony(instance.costs(), n, ants=args.ants, seed=rng.randrange(2 ** 32))
+        bound = held_karp_bound(instance.costs(), n, colony.best_cost)
+        history = colony.run(args.iterations, lower_bound=bound, gap=args.gap)
+        tour, cost = colony.best_tour, colony.best_cost
+        result['history'] = history
+        result['iterations_per_second'] = history[-1]['iterations_per_second'] if history else None
+    elif solver == 'local':
+        if graph is None:
+            tour, cost = instance_tour(instance, rng)
+        elif paths is None:
+            tour, _ = euclidean_tour(graph, rng)
+            # Report the cost under the instance's rounded EUC_2D distances, as a saved copy gives it
+            cost = instance.tour_length(tour)
+        else:
+            tour, cost = improve_tour(graph, rng=rng)
+        if n <= held_karp_limit:
+            bound = held_karp_bound(instance.costs(), n, cost)
+    result.update(lower_bound=bound, gap=optimality_gap(cost, bound) if bound is not None else None)
+    result.update(seconds=time.perf_counter() - start, cost=cost, tour=tour)
+    if paths is not None:
+        result['roads_driven'] = paths.expand_tour(tour)
+    if args.tour:
+        write_tour(tour, args.tour, name=f'{instance.name}.tour', comment=f'Tour cost {cost}')
+    rate = f', {result["iterations_per_second"]:.1f} iterations/s' if result.get('iterations_per_second') else ''
+    within = f', within {result["gap"]:.2%} of the lower bound {bound:.1f}' if bound is not None else ''
+    print(f'{solver}: tour cost {cost:.1f} over {n} cities in {result["seconds"]:.2f}s{rate}{within}',
+          file=sys.stderr)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        json.dump(result, out, indent=2)
+        out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
 # In python, we have this odd construct to catch the main thread and instantiate our Window class
 if __name__ == '__main__':
-    UI()
+    # With command-line arguments we run headless, otherwise we open the window
+    if len(sys.argv) > 1:
+        main()
+    else:
+        UI()